@@ -1,12 +1,15 @@
 from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
+import os
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-# Absolute path to the frontend directory (two levels up from backend/api/)
+# Absolute paths served by the app, resolved once (two levels up from backend/api/)
 FRONTEND_DIR = Path(__file__).parent.parent.parent / 'frontend'
+OUTPUTS_DIR = Path(__file__).parent.parent.parent / 'outputs'
+UPLOADS_DIR = Path(__file__).parent.parent.parent / 'data' / 'uploads'
 
 from api.routes import generation_routes, parameter_routes, template_routes, viewer_routes, cleanup_routes, edit_routes
 from utils.logger import api_logger
@@ -45,15 +48,34 @@ def create_app():
     @app.route('/outputs/<path:subpath>/<filename>')
     def serve_output_file(subpath, filename):
         """Serve generated files (JSON, Python, STEP, images) from outputs directory"""
-        output_dir = Path(__file__).parent.parent.parent / 'outputs' / subpath
-        return send_from_directory(output_dir, filename)
+        output_dir = OUTPUTS_DIR / subpath
+        # Generated files keep their names across regenerations, so force
+        # ETag revalidation: repeat downloads of an unchanged model come
+        # back as a bodyless 304 (send_file handles If-None-Match), while
+        # a regenerated file is picked up immediately.
+        response = send_from_directory(output_dir, filename)
+        response.cache_control.no_cache = True
+        return response
 
     @app.route('/data/uploads/<filename>')
     def serve_data_upload(filename):
         """Serve uploaded STEP files stored in data/uploads/"""
-        uploads_dir = Path(__file__).parent.parent.parent / 'data' / 'uploads'
-        return send_from_directory(uploads_dir, filename)
+        response = send_from_directory(UPLOADS_DIR, filename)
+        response.cache_control.no_cache = True
+        return response
     
+    # Warm the heavy machinery at startup instead of inside the first
+    # request: the blueprint imports above already compiled the schema
+    # validator and built the pipeline; pre-spawning the CadQuery worker
+    # moves its multi-second cadquery/OCP import out of the first
+    # generation's latency.
+    try:
+        from core.main import _get_cq_worker
+        _get_cq_worker()
+        api_logger.info("Pre-spawned CadQuery worker")
+    except Exception as e:
+        api_logger.warning(f"CadQuery worker pre-spawn failed (non-fatal): {e}")
+
     # Run auto cleanup on startup if enabled
     if config.CLEANUP_AUTO_RUN and config.CLEANUP_ENABLED:
         try:
@@ -117,4 +139,9 @@ def create_app():
 if __name__ == '__main__':
     app = create_app()
     api_logger.info("Starting SynthoCAD API server...")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Debug/reload only when asked for: the reloader doubles startup cost
+    # and pins everything to one process. threaded=True lets slow CAD
+    # generations overlap with static and status requests instead of
+    # serializing every request behind one handler.
+    debug = os.environ.get('SYNTHOCAD_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=5000, debug=debug, threaded=True)
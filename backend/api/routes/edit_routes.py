@@ -23,6 +23,11 @@ from utils.logger import api_logger
 bp = Blueprint("edit", __name__)
 logger = api_logger
 
+# Resolved once: per-request Path(__file__) chains cost several stat
+# calls each, and the directory only needs creating once per process.
+_UPLOAD_DIR = Path(__file__).resolve().parent.parent.parent.parent / "data" / "uploads"
+_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
 
 def _save_upload(file_storage) -> str:
     """Save an uploaded file to the uploads directory and return its path."""
@@ -325,17 +330,14 @@ def upload_step():
     if not file.filename or not file.filename.lower().endswith((".step", ".stp")):
         return jsonify({"error": True, "message": "Uploaded file must be a .step or .stp file."}), 400
 
-    upload_dir = Path(__file__).parent.parent.parent.parent / "data" / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
     # Use original filename; append counter to avoid overwriting
     original_name = Path(file.filename).name
-    save_path = upload_dir / original_name
+    save_path = _UPLOAD_DIR / original_name
     counter = 1
     while save_path.exists():
         stem = Path(original_name).stem
         suffix = Path(original_name).suffix
-        save_path = upload_dir / f"{stem}_{counter}{suffix}"
+        save_path = _UPLOAD_DIR / f"{stem}_{counter}{suffix}"
         counter += 1
 
     try:
@@ -12,6 +12,9 @@ from utils.logger import setup_logger
 
 logger = setup_logger('synthocad.brep_generator', 'brep_generator.log')
 
+# Resolved once instead of rebuilding the Path(__file__) chain per prompt.
+_LOOP_PROMPT_PATH = Path(__file__).resolve().parent.parent / "PROMPT_loop_patterns.md"
+
 class BRepGenerator:
     def __init__(self):
         self.engine = BRepEngine()
@@ -316,10 +319,9 @@ class BRepGenerator:
         
     def generate_brep_sequence_from_prompt(self, prompt: str) -> List[Dict[str, Any]]:
         loop_pattern_extra = ""
-        loop_prompt_path = Path(__file__).resolve().parent.parent / "PROMPT_loop_patterns.md"
-        if loop_prompt_path.exists():
+        if _LOOP_PROMPT_PATH.exists():
             try:
-                loop_pattern_extra = "\n\n" + loop_prompt_path.read_text(encoding="utf-8").strip()
+                loop_pattern_extra = "\n\n" + _LOOP_PROMPT_PATH.read_text(encoding="utf-8").strip()
             except Exception as e:
                 logger.warning(f"[Generator] Failed to read loop-pattern prompt file: {e}")
 
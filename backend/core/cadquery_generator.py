@@ -3,6 +3,41 @@ import math
 from pathlib import Path
 from typing import Optional
 
+# SCL operation -> CadQuery boolean method / name suffix. Shared by every
+# part instead of rebuilding the dicts per generated part.
+_OP_METHOD = {
+    "NewBodyFeatureOperation": "union",
+    "JoinFeatureOperation": "union",
+    "CutFeatureOperation": "cut",
+    "IntersectFeatureOperation": "intersect",
+}
+_OP_SUFFIX = {
+    "NewBodyFeatureOperation": "new",
+    "JoinFeatureOperation": "union",
+    "CutFeatureOperation": "cut",
+    "IntersectFeatureOperation": "intersect",
+}
+
+
+def _sorted_loop_items(loop_data):
+    """Bucket a loop's entities into ``(index, type, data)`` tuples, sorted.
+
+    One pass over the dict with a single suffix parse per key, instead of
+    a startswith/split pair per entity type.
+    """
+    items = []
+    for key, value in loop_data.items():
+        tag, _, num = key.partition("_")
+        if tag not in ("line", "arc", "circle"):
+            continue
+        try:
+            n = int(num)
+        except ValueError:
+            continue
+        items.append((n, tag, value))
+    items.sort(key=lambda x: x[0])
+    return items
+
 
 class CadQueryGenerator:
     def __init__(self, json_data, output_name: Optional[str] = None):
@@ -94,16 +129,7 @@ class CadQueryGenerator:
             loops = sorted(face_data.items(), key=lambda x: int(x[0].split("_")[1]))
 
             for loop_idx, (loop_name, loop_data) in enumerate(loops):
-                items = []
-                for key in loop_data:
-                    if key.startswith("line_"):
-                        items.append((int(key.split("_")[1]), "line", loop_data[key]))
-                    elif key.startswith("arc_"):
-                        items.append((int(key.split("_")[1]), "arc", loop_data[key]))
-                    elif key.startswith("circle_"):
-                        items.append((int(key.split("_")[1]), "circle", loop_data[key]))
-
-                items.sort(key=lambda x: x[0])
+                items = _sorted_loop_items(loop_data)
 
                 for idx, (num, item_type, item_data) in enumerate(items):
                     if item_type == "circle":
@@ -150,13 +176,7 @@ class CadQueryGenerator:
         if part_num == "1":
             self.add_line(f"{result_var} = wp")
         else:
-            op_map = {
-                "NewBodyFeatureOperation": "union",
-                "JoinFeatureOperation": "union",
-                "CutFeatureOperation": "cut",
-                "IntersectFeatureOperation": "intersect"
-            }
-            op_method = op_map.get(operation, "union")
+            op_method = _OP_METHOD.get(operation, "union")
             self.add_line(f"{result_var} = {result_var}.{op_method}(wp)")
 
     def generate_revolve(self, part, part_num, result_var, euler, trans):
@@ -179,16 +199,7 @@ class CadQueryGenerator:
             loops = sorted(face_data.items(), key=lambda x: int(x[0].split("_")[1]))
 
             for loop_idx, (loop_name, loop_data) in enumerate(loops):
-                items = []
-                for key in loop_data:
-                    if key.startswith("line_"):
-                        items.append((int(key.split("_")[1]), "line", loop_data[key]))
-                    elif key.startswith("arc_"):
-                        items.append((int(key.split("_")[1]), "arc", loop_data[key]))
-                    elif key.startswith("circle_"):
-                        items.append((int(key.split("_")[1]), "circle", loop_data[key]))
-
-                items.sort(key=lambda x: x[0])
+                items = _sorted_loop_items(loop_data)
 
                 for idx, (num, item_type, item_data) in enumerate(items):
                     if item_type == "line":
@@ -221,13 +232,7 @@ class CadQueryGenerator:
         if part_num == "1":
             self.add_line(f"{result_var} = wp")
         else:
-            op_map = {
-                "NewBodyFeatureOperation": "union",
-                "JoinFeatureOperation": "union",
-                "CutFeatureOperation": "cut",
-                "IntersectFeatureOperation": "intersect"
-            }
-            op_method = op_map.get(operation, "union")
+            op_method = _OP_METHOD.get(operation, "union")
             self.add_line(f"{result_var} = {result_var}.{op_method}(wp)")
 
     def generate_hole_feature(self, part, part_num, result_var, euler, trans):
@@ -360,12 +365,7 @@ class CadQueryGenerator:
             self.indent -= 1
 
     def get_operation_suffix(self, operation):
-        return {
-            "NewBodyFeatureOperation": "new",
-            "JoinFeatureOperation": "union",
-            "CutFeatureOperation": "cut",
-            "IntersectFeatureOperation": "intersect"
-        }.get(operation, "union")
+        return _OP_SUFFIX.get(operation, "union")
 
     def euler_to_matrix(self, x, y, z):
         x_rad = math.radians(x)
@@ -0,0 +1,49 @@
+"""Long-lived CadQuery execution worker.
+
+Spawning a fresh interpreter per generated script pays Python startup plus
+the cadquery/OCP import (1-3s) on every file. This worker imports cadquery
+once at startup and then executes the script paths it receives as JSON
+lines on stdin, replying with one JSON line on stdout per request:
+
+    request:  {"script": "<path>", "cwd": "<dir>"}
+    response: {"ok": true} or {"ok": false, "error": "<traceback>"}
+
+The pipeline side (``core.main``) keeps one of these alive per process and
+restarts it if it dies or times out.
+"""
+
+import json
+import os
+import runpy
+import sys
+import traceback
+
+
+def main() -> None:
+    # Generated scripts are free to print; keep the protocol channel
+    # clean by reserving the real stdout for replies and pointing
+    # sys.stdout at stderr for everything the scripts emit.
+    proto = sys.stdout
+    sys.stdout = sys.stderr
+
+    import cadquery  # noqa: F401  -- pay the OCP import exactly once
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            msg = json.loads(line)
+            cwd = msg.get("cwd")
+            if cwd:
+                os.chdir(cwd)
+            runpy.run_path(msg["script"], run_name="__main__")
+            reply = {"ok": True}
+        except Exception:
+            reply = {"ok": False, "error": traceback.format_exc()}
+        proto.write(json.dumps(reply) + "\n")
+        proto.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
+import hashlib
 import json
 import os
 import re
 import sys
 import subprocess
+import threading
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional
 import logging
 
+try:
+    import orjson
+    ORJSON_ENABLED = True
+except ImportError:
+    ORJSON_ENABLED = False
+
 sys.path.append(str(Path(__file__).parent.parent))
 
 from validators.prompt_validator import PromptValidator
@@ -24,6 +33,86 @@ from utils.logger import pipeline_logger
 from core import config
 from core.schema_loader import build_generation_prompt
 
+# One persistent CadQuery worker per pipeline process. Each generated
+# script used to run in a fresh interpreter, paying Python startup plus
+# the cadquery/OCP import every time; the worker (core/cq_worker.py)
+# imports cadquery once and executes scripts sent over its stdin.
+# The lock serializes pipe access: the threaded API server may run
+# several generations at once, and interleaved writes would corrupt the
+# one-line-request/one-line-reply protocol.
+_CQ_WORKER: Optional[subprocess.Popen] = None
+_CQ_LOCK = threading.Lock()
+
+
+def _get_cq_worker() -> subprocess.Popen:
+    global _CQ_WORKER
+    if _CQ_WORKER is None or _CQ_WORKER.poll() is not None:
+        # Script prints land on the worker's stderr; nothing buffers or
+        # reads them. Failures are reported as tracebacks in the JSON
+        # reply, so success needs no output inspection at all.
+        _CQ_WORKER = subprocess.Popen(
+            [sys.executable, str(Path(__file__).parent / "cq_worker.py")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    return _CQ_WORKER
+
+
+def _run_in_cq_worker(py_path: Path, timeout: float) -> Tuple[bool, str]:
+    """Execute one generated script in the persistent worker.
+
+    Returns ``(ok, error_text)``. A dead worker raises RetryableError and
+    a hung one raises subprocess.TimeoutExpired; in both cases the process
+    is discarded so the next call starts a fresh one.
+    """
+    global _CQ_WORKER
+    with _CQ_LOCK:
+        worker = _get_cq_worker()
+        request = json.dumps({"script": str(py_path), "cwd": str(config.STEP_OUTPUT_DIR)})
+        try:
+            worker.stdin.write(request + "\n")
+            worker.stdin.flush()
+        except (BrokenPipeError, OSError):
+            _CQ_WORKER = None
+            raise RetryableError("CadQuery worker died (retryable)")
+
+        # Wait for the reply line in a daemon thread: select() cannot
+        # watch pipe handles on Windows, so the blocking readline runs
+        # off-thread and the join supplies the cross-platform timeout
+        # (same approach subprocess.run uses internally).
+        result: list = []
+        reader = threading.Thread(
+            target=lambda: result.append(worker.stdout.readline()), daemon=True)
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive():
+            worker.kill()
+            _CQ_WORKER = None
+            raise subprocess.TimeoutExpired(cmd="cq_worker", timeout=timeout)
+
+        line = result[0] if result else ""
+        if not line:
+            worker.kill()
+            _CQ_WORKER = None
+            raise RetryableError("CadQuery worker exited unexpectedly (retryable)")
+
+    reply = json.loads(line)
+    return bool(reply.get("ok")), reply.get("error", "")
+
+
+def _scl_digest(json_data: Dict[str, Any]) -> Optional[str]:
+    """Short content hash of an SCL document's canonical serialization."""
+    try:
+        if ORJSON_ENABLED:
+            blob = orjson.dumps(json_data, option=orjson.OPT_SORT_KEYS)
+        else:
+            blob = json.dumps(json_data, sort_keys=True).encode()
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
 
 class SynthoCadPipeline:
 
@@ -120,7 +209,7 @@ class SynthoCadPipeline:
 
             cleaned_text = self._strip_markdown_json(response_text)
 
-            json_data = json.loads(cleaned_text)
+            json_data = orjson.loads(cleaned_text) if ORJSON_ENABLED else json.loads(cleaned_text)
 
             json_data = self._strip_llm_comments(json_data)
             json_data, repairs = repair_json(json_data)
@@ -141,7 +230,7 @@ class SynthoCadPipeline:
                 )
                 response_text = call_gemini(retry_prompt, max_tokens=8192, temperature=0.1)
                 cleaned_text = self._strip_markdown_json(response_text)
-                json_data = json.loads(cleaned_text)
+                json_data = orjson.loads(cleaned_text) if ORJSON_ENABLED else json.loads(cleaned_text)
                 json_data = self._strip_llm_comments(json_data)
                 json_data, repairs = repair_json(json_data)
 
@@ -259,19 +348,13 @@ class SynthoCadPipeline:
 
             step_file = config.STEP_OUTPUT_DIR / f"{output_name}.step"
 
-            result = subprocess.run(
-                [sys.executable, str(py_path)],
-                capture_output=True,
-                text=True,
-                timeout=config.EXECUTION_TIMEOUT,
-                cwd=config.STEP_OUTPUT_DIR,
-            )
+            ok, error_text = _run_in_cq_worker(py_path, config.EXECUTION_TIMEOUT)
 
-            if result.returncode != 0:
-                self.logger.error(f"Execution failed: {result.stderr}")
-                if "temporarily" in result.stderr.lower() or "resource" in result.stderr.lower():
-                    raise RetryableError(f"Python execution failed (retryable): {result.stderr}")
-                raise ExecutionError(f"Python execution failed: {result.stderr}")
+            if not ok:
+                self.logger.error(f"Execution failed: {error_text}")
+                if "temporarily" in error_text.lower() or "resource" in error_text.lower():
+                    raise RetryableError(f"Python execution failed (retryable): {error_text}")
+                raise ExecutionError(f"Python execution failed: {error_text}")
 
             if not step_file.exists():
                 raise ExecutionError("STEP file was not created")
@@ -362,6 +445,10 @@ class SynthoCadPipeline:
         )
         py_path.write_text(content)
 
+        # The STEP no longer corresponds to the originally submitted JSON,
+        # so drop the reuse digest to keep the cache honest.
+        (config.STEP_OUTPUT_DIR / f"{output_name}.scl_digest").unlink(missing_ok=True)
+
         step_file = self.execute_cadquery_code(str(py_path), output_name)
 
         if open_freecad:
@@ -388,13 +475,32 @@ class SynthoCadPipeline:
             output_name = output_name.replace(" ", "_").replace("/", "_")
 
             json_file = config.JSON_OUTPUT_DIR / f"{output_name}.json"
-            with open(json_file, "w") as f:
-                json.dump(json_data, f, indent=2)
+            if ORJSON_ENABLED:
+                json_file.write_bytes(orjson.dumps(json_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(json_file, "w") as f:
+                    json.dump(json_data, f, indent=2)
             self.logger.info(f"Saved JSON: {json_file}")
 
-            py_file = self.generate_cadquery_code(json_data, output_name)
-
-            step_file = self.execute_cadquery_code(py_file, output_name)
+            # Regenerating an unchanged document produces the same script
+            # and the same STEP; a sidecar digest of the canonical JSON
+            # lets identical resubmissions skip code generation and the
+            # CadQuery run, by far the heaviest steps.
+            digest = _scl_digest(json_data)
+            cached_py = config.PY_OUTPUT_DIR / f"{output_name}_generated.py"
+            cached_step = config.STEP_OUTPUT_DIR / f"{output_name}.step"
+            digest_file = config.STEP_OUTPUT_DIR / f"{output_name}.scl_digest"
+
+            if (digest and cached_py.exists() and cached_step.exists()
+                    and digest_file.exists() and digest_file.read_text() == digest):
+                self.logger.info(f"Reusing cached STEP for unchanged JSON: {cached_step}")
+                py_file = str(cached_py)
+                step_file = str(cached_step)
+            else:
+                py_file = self.generate_cadquery_code(json_data, output_name)
+                step_file = self.execute_cadquery_code(py_file, output_name)
+                if digest:
+                    digest_file.write_text(digest)
 
             params_result = self.extract_parameters(py_file)
 
@@ -434,25 +540,82 @@ class SynthoCadPipeline:
             return {"status": "error", "error": e.to_dict()}
 
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <json_file>")
-        sys.exit(1)
+# Per-process pipeline for batch workers: building the pipeline (template
+# index, RAG provider, services) is expensive, so each worker process
+# constructs it once and reuses it for every file it is handed.
+_WORKER_PIPELINE: Optional[SynthoCadPipeline] = None
+
+
+def _process_single_file(json_file_path: str) -> Dict[str, Any]:
+    """Process one SCL JSON file; used directly and as the batch worker."""
+    global _WORKER_PIPELINE
+    if _WORKER_PIPELINE is None:
+        _WORKER_PIPELINE = SynthoCadPipeline(rag_provider=config.get_rag_provider())
+
+    try:
+        # orjson's C parser is 2-5x faster than stdlib json on typical
+        # SCL files; the error type subclasses json.JSONDecodeError.
+        raw = Path(json_file_path).read_bytes()
+        json_data = orjson.loads(raw) if ORJSON_ENABLED else json.loads(raw)
+    except (OSError, json.JSONDecodeError) as e:
+        return {"status": "error", "json_file": json_file_path,
+                "error": {"code": "INVALID_INPUT", "message": str(e)}}
+
+    result = _WORKER_PIPELINE.process_from_json(json_data, open_freecad=False)
+    result.setdefault("json_file", json_file_path)
+    return result
+
 
-    json_file_path = sys.argv[1]
+def batch_process(json_files, max_workers: Optional[int] = None) -> list:
+    """Process many SCL JSON files in parallel.
 
-    with open(json_file_path, "r") as f:
-        json_data = json.load(f)
+    Each file runs in a separate process: the CadQuery execution step is
+    CPU-bound and OCP holds the GIL, so worker processes scale with core
+    count where a thread pool would not. ``json_files`` may be any
+    iterable (e.g. a lazy ``rglob``); it is consumed as the pool drains
+    it rather than materialized up front. Results come back in input
+    order.
+    """
+    files = iter(json_files)
+    first = next(files, None)
+    if first is None:
+        return []
+    second = next(files, None)
+    if second is None:
+        return [_process_single_file(str(first))]
 
-    pipeline = SynthoCadPipeline(rag_provider=config.get_rag_provider())
-    result = pipeline.process_from_json(json_data, open_freecad=False)
+    from concurrent.futures import ProcessPoolExecutor
+
+    stream = (str(p) for p in chain((first, second), files))
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_process_single_file, stream, chunksize=8))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python main.py <json_file_or_dir> [<json_file> ...]")
+        sys.exit(1)
 
-    if result["status"] == "success":
-        print("[SUCCESS]")
-        print(f"  JSON:       {result['json_file']}")
-        print(f"  Python:     {result['py_file']}")
-        print(f"  STEP:       {result['step_file']}")
-        print(f"  Parameters: {result['parameters']['total_count']} found")
-    else:
-        print(f"[FAILED] {result['error']}")
+    # Directories stream their *.json files lazily so the first worker
+    # starts before the walk finishes.
+    inputs = chain.from_iterable(
+        sorted(Path(arg).rglob("*.json")) if Path(arg).is_dir() else (arg,)
+        for arg in sys.argv[1:]
+    )
+    results = batch_process(inputs)
+
+    failed = 0
+    for result in results:
+        if result["status"] == "success":
+            print("[SUCCESS]")
+            print(f"  JSON:       {result['json_file']}")
+            print(f"  Python:     {result['py_file']}")
+            print(f"  STEP:       {result['step_file']}")
+            print(f"  Parameters: {result['parameters']['total_count']} found")
+        else:
+            print(f"[FAILED] {result.get('json_file', '?')}: {result['error']}")
+            failed += 1
+
+    if failed:
         sys.exit(1)
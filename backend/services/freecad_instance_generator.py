@@ -1,3 +1,4 @@
+import glob
 import subprocess
 import sys
 from pathlib import Path
@@ -5,29 +6,35 @@ from typing import Optional
 import time
 import os
 
+# The installed executable does not move while the process runs, so the
+# candidate probe (several stat calls, slow on network-mounted Program
+# Files) happens once per process instead of once per instance.
+_FREECAD_PATH: Optional[str] = None
+_FREECAD_RESOLVED = False
+
+
+def _resolve_freecad() -> Optional[str]:
+    global _FREECAD_PATH, _FREECAD_RESOLVED
+    if not _FREECAD_RESOLVED:
+        candidates = [
+            *glob.glob(r"C:\Program Files*\FreeCAD*\bin\FreeCAD.exe"),
+            "/usr/bin/freecad",
+            "/usr/local/bin/freecad",
+            "/Applications/FreeCAD.app/Contents/MacOS/FreeCAD",
+        ]
+        _FREECAD_PATH = next((p for p in candidates if Path(p).exists()), None)
+        _FREECAD_RESOLVED = True
+    return _FREECAD_PATH
+
 
 class FreeCADInstanceGenerator:
-    
+
     def __init__(self, freecad_path: Optional[str] = None):
         self.freecad_path = freecad_path or self.find_freecad()
         self.process = None
-        
+
     def find_freecad(self) -> Optional[str]:
-        common_paths = [
-            r"C:\Program Files\FreeCAD 0.21\bin\FreeCAD.exe",
-            r"C:\Program Files\FreeCAD 0.22\bin\FreeCAD.exe",
-            r"C:\Program Files\FreeCAD\bin\FreeCAD.exe",
-            r"C:\Program Files (x86)\FreeCAD\bin\FreeCAD.exe",
-            "/usr/bin/freecad",
-            "/usr/local/bin/freecad",
-            "/Applications/FreeCAD.app/Contents/MacOS/FreeCAD"
-        ]
-        
-        for path in common_paths:
-            if Path(path).exists():
-                return path
-                
-        return None
+        return _resolve_freecad()
         
     def open_step_file(self, step_file_path: str, async_mode: bool = True) -> bool:
         
@@ -52,10 +59,16 @@ class FreeCADInstanceGenerator:
                     stderr=subprocess.PIPE,
                     creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0
                 )
-                time.sleep(1)
-                if self.process.poll() is not None:
-                    stdout, stderr = self.process.communicate()
-                    raise RuntimeError(f"FreeCAD failed to start: {stderr.decode()}")
+                # Poll instead of sleeping a flat second: a bad launch
+                # is reported within ~20ms rather than after the full
+                # grace period. No readiness event exists without the
+                # GUI bindings, so a healthy launch still waits it out.
+                deadline = time.monotonic() + 1.0
+                while time.monotonic() < deadline:
+                    if self.process.poll() is not None:
+                        stdout, stderr = self.process.communicate()
+                        raise RuntimeError(f"FreeCAD failed to start: {stderr.decode()}")
+                    time.sleep(0.02)
                 return True
             else:
                 result = subprocess.run(
@@ -73,9 +86,10 @@ class FreeCADInstanceGenerator:
     def reload_step_file(self, step_file_path: str) -> bool:
         
         if self.process and self.process.poll() is None:
+            # close() already waits for the process to exit, so no extra
+            # settling sleep is needed before relaunching.
             self.close()
-            time.sleep(0.5)
-            
+
         return self.open_step_file(step_file_path)
         
     def is_running(self) -> bool:
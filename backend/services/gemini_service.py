@@ -1,4 +1,5 @@
 """Gemini LLM Service - Production-safe REST API client with error recovery."""
+import asyncio
 import os
 import time
 import requests
@@ -26,6 +27,72 @@ BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
 VALID_MODELS = ["gemini-2.5-flash", "gemini-2.5-pro", "gemini-3-flash"]
 DEFAULT_MODEL = "gemini-2.5-flash"
 
+# sha256(static text) -> (cachedContents resource name, monotonic expiry),
+# so each static prompt block is uploaded to Gemini's context cache at
+# most once per TTL window and later calls reference it by handle. The
+# handle is recreated shortly before the server-side TTL lapses; failed
+# uploads are remembered briefly so caching is retried without hammering.
+_CACHED_CONTENT_HANDLES = {}
+
+# Recreate this many seconds before the TTL actually expires, so a call
+# never goes out with a handle the server is about to delete.
+_CACHE_REFRESH_MARGIN = 60.0
+_CACHE_FAILURE_RETRY = 300.0
+
+
+def create_cached_content(text: str, model: Optional[str] = None,
+                          ttl: str = "3600s") -> Optional[str]:
+    """Upload *text* to Gemini's context cache and return its handle.
+
+    Returns None when caching is unavailable (missing key, API error,
+    content below the minimum cacheable size) so callers can fall back
+    to sending the full prompt inline.
+    """
+    import hashlib
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    now = time.monotonic()
+    entry = _CACHED_CONTENT_HANDLES.get(key)
+    if entry is not None and now < entry[1]:
+        return entry[0]
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+    if model is None:
+        model = os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+
+    body = {
+        "model": f"models/{model}",
+        "contents": [{"role": "user", "parts": [{"text": text}]}],
+        "ttl": ttl,
+    }
+    try:
+        resp = requests.post(f"{BASE_URL}/cachedContents",
+                             params={"key": api_key}, json=body, timeout=60)
+        resp.raise_for_status()
+        name = resp.json().get("name")
+    except Exception as e:
+        print(f"[WARNING] Gemini context caching unavailable: {e}")
+        name = None
+
+    if name is None:
+        expires = now + _CACHE_FAILURE_RETRY
+    else:
+        try:
+            ttl_seconds = float(ttl.rstrip("s"))
+        except ValueError:
+            ttl_seconds = 3600.0
+        expires = now + max(ttl_seconds - _CACHE_REFRESH_MARGIN, 0.0)
+    _CACHED_CONTENT_HANDLES[key] = (name, expires)
+    return name
+
+
+def _evict_cached_content(name: str) -> None:
+    """Drop a memoized handle the API has rejected (expired or deleted)."""
+    for key, entry in list(_CACHED_CONTENT_HANDLES.items()):
+        if entry[0] == name:
+            del _CACHED_CONTENT_HANDLES[key]
+
 
 def _extract_text_from_response(resp_json: dict) -> str:
     """Extract text from Gemini API response."""
@@ -51,7 +118,8 @@ def _extract_text_from_response(resp_json: dict) -> str:
 
 
 def call_gemini(prompt: str, model: Optional[str] = None, max_tokens: Optional[int] = None,
-                temperature: float = 0.1, json_mode: bool = False) -> str:
+                temperature: float = 0.1, json_mode: bool = False,
+                cached_content: Optional[str] = None) -> str:
     """
     Call Google Gemini REST API with automatic retry and error recovery.
 
@@ -59,6 +127,10 @@ def call_gemini(prompt: str, model: Optional[str] = None, max_tokens: Optional[i
         json_mode: When True, sets responseMimeType to application/json so Gemini
                    is constrained to output valid JSON. Use for all structured
                    generation calls (SCL JSON, plausibility checks, etc.).
+        cached_content: Optional cachedContents handle from
+                   create_cached_content(); the static block it refers to
+                   is prepended server-side, so *prompt* should hold only
+                   the dynamic tail.
     """
     if ERROR_RECOVERY_ENABLED:
         error_recovery = ErrorRecoveryService()
@@ -77,13 +149,25 @@ def call_gemini(prompt: str, model: Optional[str] = None, max_tokens: Optional[i
             max_tokens=max_tokens,
             temperature=temperature,
             json_mode=json_mode,
+            cached_content=cached_content,
         )
     else:
-        return _call_gemini_internal(prompt, model, max_tokens, temperature, json_mode=json_mode)
+        return _call_gemini_internal(prompt, model, max_tokens, temperature, json_mode=json_mode,
+                                     cached_content=cached_content)
+
+
+async def call_gemini_async(prompt: str, **kwargs) -> str:
+    """Async sibling of call_gemini with identical semantics.
+
+    Runs the blocking REST call in a worker thread so the event loop can
+    interleave other requests during the seconds-long generation wait.
+    """
+    return await asyncio.to_thread(call_gemini, prompt, **kwargs)
 
 
 def _call_gemini_internal(prompt: str, model: Optional[str] = None, max_tokens: Optional[int] = None,
-                          temperature: float = 0.1, json_mode: bool = False) -> str:
+                          temperature: float = 0.1, json_mode: bool = False,
+                          cached_content: Optional[str] = None) -> str:
     """Internal Gemini API call (without retry wrapper)."""
     
     # Get API key
@@ -112,6 +196,8 @@ def _call_gemini_internal(prompt: str, model: Optional[str] = None, max_tokens:
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": gen_config
     }
+    if cached_content:
+        body["cachedContent"] = cached_content
     
     # Retry logic for rate limits (internal simple retry)
     max_retries = 3
@@ -129,7 +215,16 @@ def _call_gemini_internal(prompt: str, model: Optional[str] = None, max_tokens:
             if ERROR_RECOVERY_ENABLED:
                 raise RetryableError(f"Gemini server error: {resp.status_code}")
             raise RuntimeError(f"Gemini server error: {resp.status_code}")
-        
+
+        if resp.status_code >= 400 and "cachedContent" in body:
+            # The memoized handle may have outlived its server-side TTL.
+            # Evict it and retry once with the full prompt inline; a
+            # genuine client error will fail again below.
+            print(f"[WARNING] Gemini rejected cachedContent handle "
+                  f"({resp.status_code}); retrying without context cache")
+            _evict_cached_content(body.pop("cachedContent"))
+            continue
+
         resp.raise_for_status()
         data = resp.json()
         return _extract_text_from_response(data)
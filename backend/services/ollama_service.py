@@ -3,6 +3,7 @@
 Provides an interface to local models via Ollama. 
 Recommended models for CPU: qwen2.5:7b, llama3.1:8b (quantized).
 """
+import asyncio
 import os
 import json
 import requests
@@ -63,6 +64,11 @@ def call_ollama(prompt: str, model: Optional[str] = None, max_tokens: int = 4096
         logger.error(f"Ollama request failed: {e}")
         raise RuntimeError(f"Local LLM call failed: {str(e)}")
 
+async def call_ollama_async(prompt: str, **kwargs) -> str:
+    """Async sibling of call_ollama with identical semantics."""
+    return await asyncio.to_thread(call_ollama, prompt, **kwargs)
+
+
 if __name__ == "__main__":
     # Test call
     import sys
@@ -9,6 +9,7 @@ No LLM required — pure Python AST parsing.
 
 import ast
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
@@ -74,6 +75,16 @@ _DESC: Dict[str, str] = {
     "count":          "Count",
 }
 
+@lru_cache(maxsize=None)
+def _desc_label(short: str) -> str:
+    """Human-readable label for *short*, built once per distinct name.
+
+    Cache is bounded by the set of distinct arg names seen (essentially
+    METHOD_ARG_NAMES values plus keyword args), so maxsize=None is safe.
+    """
+    return _DESC.get(short) or short.replace("_", " ").title()
+
+
 # Args that must be > 0
 _POSITIVE_ARGS = {"radius", "depth", "diameter", "thickness",
                   "cbore_diameter", "cbore_depth", "csk_diameter"}
@@ -91,9 +102,15 @@ class ParameterExtractor:
             raise FileNotFoundError(f"Python file not found: {py_file_path}")
 
         code = py_path.read_text(encoding="utf-8")
-        code_lines = code.splitlines(keepends=True)
         tree = ast.parse(code)
 
+        # Line slices are only needed by the _text_at regex fallback when a
+        # Constant lacks end_col_offset (pre-3.8 ASTs); build them lazily so
+        # the common path never pays the O(N) splitlines allocation.
+        @lru_cache(maxsize=1)
+        def get_lines() -> List[str]:
+            return code.splitlines(keepends=True)
+
         parameters: List[Dict[str, Any]] = []
         method_counts: Dict[str, int] = {}   # occurrence counter
 
@@ -110,7 +127,7 @@ class ParameterExtractor:
 
             # ── positional arguments ──────────────────────────────────
             for i, arg_node in enumerate(node.args):
-                nums = self._extract_nums(arg_node, code_lines)
+                nums = self._extract_nums(arg_node, get_lines)
                 for ni, (val, lineno, col_offset, end_col) in enumerate(nums):
                     if arg_names and i < len(arg_names):
                         short = arg_names[i]
@@ -132,7 +149,7 @@ class ParameterExtractor:
             for kw in node.keywords:
                 if kw.arg is None:
                     continue
-                nums = self._extract_nums(kw.value, code_lines)
+                nums = self._extract_nums(kw.value, get_lines)
                 for ni, (val, lineno, col_offset, end_col) in enumerate(nums):
                     if len(nums) == 1:
                         short = kw.arg
@@ -182,15 +199,15 @@ class ParameterExtractor:
 
     @classmethod
     def _extract_nums(cls, node: ast.expr,
-                      code_lines: List[str]) -> List[tuple]:
+                      get_lines) -> List[tuple]:
         """Return list of (value, lineno, col_offset, end_col) for numerics."""
-        single = cls._single_num(node, code_lines)
+        single = cls._single_num(node, get_lines)
         if single is not None:
             return [single]
         if isinstance(node, ast.Tuple):
             out = []
             for elt in node.elts:
-                s = cls._single_num(elt, code_lines)
+                s = cls._single_num(elt, get_lines)
                 if s is not None:
                     out.append(s)
             return out
@@ -198,27 +215,14 @@ class ParameterExtractor:
 
     @classmethod
     def _single_num(cls, node: ast.expr,
-                    code_lines: List[str]) -> Optional[tuple]:
-        """Extract (value, line, col, end_col) from a numeric literal node."""
-        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
-            val = float(node.value)
-            ln = node.lineno
-            col = node.col_offset
-            end = getattr(node, "end_col_offset", None)
-            if end is None:
-                end = col + len(cls._text_at(code_lines, ln, col))
-            return (val, ln, col, end)
-        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
-            inner = node.operand
-            if isinstance(inner, ast.Constant) and isinstance(inner.value, (int, float)):
-                val = -float(inner.value)
-                ln = node.lineno
-                col = node.col_offset
-                end = getattr(inner, "end_col_offset", None)
-                if end is None:
-                    end = col + 1 + len(cls._text_at(code_lines, inner.lineno, inner.col_offset))
-                return (val, ln, col, end)
-        return None
+                    get_lines) -> Optional[tuple]:
+        """Extract (value, line, col, end_col) from a numeric literal node.
+
+        *get_lines* is a zero-arg callable yielding the source lines; it is
+        only invoked on the end_col_offset fallback path.
+        """
+        handler = _NUM_DISPATCH.get(type(node))
+        return handler(node, get_lines) if handler else None
 
     @staticmethod
     def _text_at(lines: List[str], lineno: int, col: int) -> str:
@@ -232,7 +236,7 @@ class ParameterExtractor:
     @staticmethod
     def _mk(*, name, value, method, arg_index, keyword, short,
             lineno, col_offset, end_col) -> Dict[str, Any]:
-        desc_label = _DESC.get(short, short.replace("_", " ").title())
+        desc_label = _desc_label(short)
         unit = "degrees" if "angle" in short.lower() else "mm"
         positive = short in _POSITIVE_ARGS
         return {
@@ -250,3 +254,39 @@ class ParameterExtractor:
             "col_offset": col_offset,
             "end_col": end_col,
         }
+
+
+# ── numeric-node dispatch (type(node) lookup beats chained isinstance) ────
+
+def _handle_const(node: ast.Constant, get_lines) -> Optional[tuple]:
+    if not isinstance(node.value, (int, float)):
+        return None
+    val = float(node.value)
+    ln = node.lineno
+    col = node.col_offset
+    end = getattr(node, "end_col_offset", None)
+    if end is None:
+        end = col + len(ParameterExtractor._text_at(get_lines(), ln, col))
+    return (val, ln, col, end)
+
+
+def _handle_unary(node: ast.UnaryOp, get_lines) -> Optional[tuple]:
+    inner = node.operand
+    if not (isinstance(node.op, ast.USub)
+            and isinstance(inner, ast.Constant)
+            and isinstance(inner.value, (int, float))):
+        return None
+    val = -float(inner.value)
+    ln = node.lineno
+    col = node.col_offset
+    end = getattr(inner, "end_col_offset", None)
+    if end is None:
+        end = col + 1 + len(ParameterExtractor._text_at(
+            get_lines(), inner.lineno, inner.col_offset))
+    return (val, ln, col, end)
+
+
+_NUM_DISPATCH = {
+    ast.Constant: _handle_const,
+    ast.UnaryOp:  _handle_unary,
+}
@@ -53,21 +53,58 @@ class ParameterUpdater:
         if not edits:
             return True   # nothing to change
 
-        # Read source, apply edits (process bottom-up → right-to-left so
-        # earlier edits don't shift positions of later ones)
-        lines = py_path.read_text(encoding="utf-8").splitlines(keepends=True)
-        # Sort descending by (line, col) so we splice from the end
+        # Sort descending by (line, col) so we splice from the end and
+        # earlier edits don't shift positions of later ones.
         edits.sort(key=lambda e: (e[0], e[1]), reverse=True)
 
+        # CadQuery-generated source is plain ASCII, so AST column offsets
+        # equal byte offsets: splice the raw bytes and skip the UTF-8
+        # decode/encode round-trip entirely.
+        code = py_path.read_bytes()
+        if code.isascii():
+            py_path.write_bytes(self._splice_bytes(code, edits))
+        else:
+            py_path.write_text(
+                self._splice_lines(code.decode("utf-8"), edits),
+                encoding="utf-8",
+            )
+        return True
+
+    # ── splicing helpers ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _splice_bytes(code: bytes,
+                      edits: List[Tuple[int, int, int, str]]) -> bytes:
+        """Apply *edits* (sorted descending) to ASCII source bytes."""
+        # Byte offset of the start of each line (1-based lineno - 1 indexes)
+        line_starts = [0]
+        find = code.find
+        pos = find(b"\n")
+        while pos != -1:
+            line_starts.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+
+        buf = bytearray(code)
+        for lineno, col, end_col, new_text in edits:
+            idx = lineno - 1
+            if idx < 0 or idx >= len(line_starts):
+                continue
+            start = line_starts[idx]
+            buf[start + col:start + end_col] = new_text.encode("ascii")
+        return bytes(buf)
+
+    @staticmethod
+    def _splice_lines(text: str,
+                      edits: List[Tuple[int, int, int, str]]) -> str:
+        """str-level fallback for (unexpected) non-ASCII source."""
+        lines = text.splitlines(keepends=True)
         for lineno, col, end_col, new_text in edits:
             idx = lineno - 1
             if idx < 0 or idx >= len(lines):
                 continue
             line = lines[idx]
             lines[idx] = line[:col] + new_text + line[end_col:]
-
-        py_path.write_text("".join(lines), encoding="utf-8")
-        return True
+        return "".join(lines)
 
     # ── validation (unchanged) ────────────────────────────────────────────
 
@@ -1,12 +1,89 @@
+import heapq
 import json
+import operator
 import os
 import re
 import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger("template_index")
 
+try:
+    import ahocorasick
+    AHOCORASICK_ENABLED = True
+except ImportError:
+    AHOCORASICK_ENABLED = False
+
+try:
+    import orjson
+    ORJSON_ENABLED = True
+except ImportError:
+    ORJSON_ENABLED = False
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_ENABLED = True
+except ImportError:
+    NUMBA_ENABLED = False
+
+
+if NUMBA_ENABLED:
+    @njit(cache=True)
+    def _score_kernel(word_ids, starts, tpl, weights, out):
+        """Accumulate CSR token-posting weights into per-template scores."""
+        for i in range(word_ids.shape[0]):
+            wid = word_ids[i]
+            if wid < 0:
+                continue
+            for k in range(starts[wid], starts[wid + 1]):
+                out[tpl[k]] += weights[k]
+
+# Compiled once; \b anchors are redundant when only [a-z]+ runs match
+_WORD_RE = re.compile(r'[a-z]+')
+
+
+def _inflected_forms(word: str) -> Tuple[str, ...]:
+    """Simple suffix variants of an indexed keyword word.
+
+    The pre-index scorer matched single-word keywords as substrings of
+    the prompt, so "washer" also hit "washers" and "thread" hit
+    "threaded". Exact-token postings need those variants spelled out.
+    """
+    forms = [word + "s"]
+    if word.endswith(("s", "sh", "ch", "x", "z")):
+        forms.append(word + "es")
+    if word.endswith("y") and len(word) > 2:
+        forms.append(word[:-1] + "ies")
+    if word.endswith("e"):
+        forms.append(word + "d")
+        forms.append(word[:-1] + "ing")
+    else:
+        forms.append(word + "ed")
+        forms.append(word + "ing")
+    return tuple(forms)
+
+
+@lru_cache(maxsize=512)
+def _load_json_cached(str_path: str, mtime_ns: int) -> Optional[Dict]:
+    """Process-wide template loader keyed on (path, mtime).
+
+    Module-level so multiple TemplateIndex instances pointing at the same
+    templates_dir share one parsed copy of each file; the mtime key makes
+    on-disk edits show up as fresh cache entries.
+    """
+    try:
+        with open(str_path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if ORJSON_ENABLED else json.loads(raw)
+    except (ValueError, FileNotFoundError) as e:
+        logger.warning(f"Failed to load template {str_path}: {e}")
+        return None
+
 
 TEMPLATE_KEYWORD_MAP = {
     "basic/cylinder.json": {
@@ -492,72 +569,314 @@ TEMPLATE_KEYWORD_MAP = {
 }
 
 
+def _normalize_keyword_map():
+    """Attach precomputed lowercase keyword data to each template entry.
+
+    Runs once at import so no consumer ever re-lowers, re-splits, or
+    re-sets keyword strings: each meta gains ``_kw_norm`` — a tuple of
+    ``(kw_lower, kw_words_frozenset, word_count)`` — and
+    ``_category_lower``.
+    """
+    for meta in TEMPLATE_KEYWORD_MAP.values():
+        norm = []
+        for keyword in meta["keywords"]:
+            kw_lower = keyword.lower()
+            words = kw_lower.split()
+            norm.append((kw_lower, frozenset(words), len(words)))
+        meta["_kw_norm"] = tuple(norm)
+        meta["_category_lower"] = meta["category"].lower()
+
+
+_normalize_keyword_map()
+
+
+@dataclass(slots=True)
+class TemplateRecord:
+    """A preloaded, validated template with its hot metadata.
+
+    Slotted so per-record access skips instance-dict lookups; SCL
+    validation runs once when the record is built, never at query time.
+    """
+    path: str
+    data: Dict
+    category: str
+    complexity: str
+    keywords: tuple
+    final_name: str
+    is_scl: bool
+
+
 class TemplateIndex:
     """Index of all templates with keyword matching for RAG retrieval."""
 
-    def __init__(self, templates_dir: Path):
+    def __init__(self, templates_dir: Path, lazy: bool = False):
         self.templates_dir = templates_dir
         self.index = TEMPLATE_KEYWORD_MAP
-        self._loaded_cache = {}
+        self._build_keyword_index()
+        # Eagerly load + SCL-validate every indexed template once so
+        # queries become a single dict lookup instead of repeating
+        # exists()/load/_is_scl_format per candidate. Pass lazy=True to
+        # keep the old on-demand behavior (memory-constrained callers).
+        self._valid_templates = None if lazy else self._scan_templates()
+        self._template_names = (
+            None if lazy else self._collect_template_names())
+        # Fallback for empty results, resolved once instead of per query
+        default_path = self.templates_dir / "basic" / "cylinder_10x20.json"
+        self._default_template = (
+            self._load_template(default_path) if default_path.exists()
+            else None)
+        # O(1) name lookups: stem → path, plus lowercased paths for the
+        # substring fallback. The rglob result is cached lazily.
+        self._stem_to_path = {Path(p).stem.lower(): p for p in self.index}
+        self._lower_paths = [(p.lower(), p) for p in self.index]
+        self._all_json_paths = None
+        self._list_all_cache = None
+        self._complexity_cache = {}
+        # Per-instance memo of the pure ranking step; chat-style workloads
+        # repeat prompts, so identical queries skip scoring entirely.
+        self._rank_cached = lru_cache(maxsize=256)(self._rank_templates)
+
+    def _build_keyword_index(self):
+        """Build inverted keyword → template postings from the keyword map.
+
+        Scoring is precomputed so a query only touches the postings for
+        its own words instead of scanning every keyword of every template:
+        - single-word keyword match = 4 (3 substring + 1 word overlap,
+          matching the original per-call scoring)
+        - multi-word phrase match = 3 × word_count, with each component
+          word also scoring 1 on its own
+        - category mention = +2
+        """
+        token_postings = defaultdict(list)
+        phrase_postings = defaultdict(list)
+        category_index = defaultdict(list)
+
+        for template_path, meta in self.index.items():
+            for kw_lower, kw_words, word_count in meta["_kw_norm"]:
+                if word_count == 1:
+                    token_postings[kw_lower].append((template_path, 4))
+                else:
+                    phrase_postings[kw_lower].append(
+                        (template_path, 3 * word_count))
+                    for word in kw_words:
+                        token_postings[word].append((template_path, 1))
+            category_index[meta["_category_lower"]].append(template_path)
+
+        # Route inflected prompt tokens ("washers", "threaded") to the
+        # same postings as their base keyword. Explicit keywords always
+        # win: a variant is only added where no real keyword exists.
+        variant_postings = defaultdict(list)
+        for word, postings in token_postings.items():
+            for variant in _inflected_forms(word):
+                if variant not in token_postings:
+                    variant_postings[variant].extend(postings)
+        token_postings.update(variant_postings)
+
+        self._token_postings = dict(token_postings)
+        self._phrase_postings = dict(phrase_postings)
+        self._category_index = dict(category_index)
+
+        # With numba available, token scoring runs as a compiled kernel
+        # over integer-encoded CSR postings instead of Python dict math.
+        self._numba_index = None
+        if NUMBA_ENABLED:
+            self._build_numba_index()
+
+        # With pyahocorasick available, all multi-word phrases are matched
+        # in one linear pass over the prompt instead of one substring scan
+        # per phrase. Plain `phrase in prompt` semantics are preserved.
+        self._phrase_automaton = None
+        if AHOCORASICK_ENABLED and self._phrase_postings:
+            automaton = ahocorasick.Automaton()
+            for phrase, postings in self._phrase_postings.items():
+                automaton.add_word(phrase, tuple(postings))
+            automaton.make_automaton()
+            self._phrase_automaton = automaton
+
+    def _build_numba_index(self):
+        """Integer-encode the postings for the compiled scoring kernel.
+
+        Token postings become three parallel int32 arrays in CSR layout
+        (starts / template ids / weights); phrase and category postings
+        become id arrays so their bonuses are single vectorized adds.
+        """
+        tpl_paths = list(self.index)
+        tpl_ids = {p: i for i, p in enumerate(tpl_paths)}
+
+        word_to_id = {}
+        starts = [0]
+        tpl_flat = []
+        w_flat = []
+        for word, postings in self._token_postings.items():
+            word_to_id[word] = len(word_to_id)
+            for template_path, weight in postings:
+                tpl_flat.append(tpl_ids[template_path])
+                w_flat.append(weight)
+            starts.append(len(tpl_flat))
+
+        self._numba_index = {
+            "tpl_paths": tpl_paths,
+            "word_to_id": word_to_id,
+            "starts": np.asarray(starts, dtype=np.int32),
+            "tpl": np.asarray(tpl_flat, dtype=np.int32),
+            "weights": np.asarray(w_flat, dtype=np.int32),
+            "phrase_ids": {
+                phrase: (
+                    np.asarray([tpl_ids[p] for p, _ in postings], np.int32),
+                    np.asarray([w for _, w in postings], np.int32),
+                )
+                for phrase, postings in self._phrase_postings.items()
+            },
+            "category_ids": {
+                cat: np.asarray([tpl_ids[p] for p in paths], np.int32)
+                for cat, paths in self._category_index.items()
+            },
+        }
+
+    def _rank_templates_numba(self, prompt_lower: str, prompt_words,
+                              max_results: int) -> Tuple[str, ...]:
+        """Compiled-kernel twin of the dict scoring path."""
+        idx = self._numba_index
+        word_to_id = idx["word_to_id"]
+        word_ids = np.asarray(
+            [word_to_id.get(w, -1) for w in prompt_words], dtype=np.int32)
+
+        scores = np.zeros(len(idx["tpl_paths"]), dtype=np.int32)
+        if word_ids.size:
+            _score_kernel(word_ids, idx["starts"], idx["tpl"],
+                          idx["weights"], scores)
+        for phrase, (ids, weights) in idx["phrase_ids"].items():
+            if phrase in prompt_lower:
+                scores[ids] += weights
+        # Membership tests beat building an intermediate intersection set
+        # for the dozen-odd category names
+        for category, ids in idx["category_ids"].items():
+            if category in prompt_words:
+                scores[ids] += 2
+
+        if self._valid_templates is not None:
+            # Invalid/alt-format templates can never be returned, so mask
+            # them out of scoring and fetch exactly max_results.
+            mask = idx.get("valid_mask")
+            if mask is None:
+                tpl_paths = idx["tpl_paths"]
+                mask = np.asarray(
+                    [p in self._valid_templates for p in tpl_paths],
+                    dtype=bool)
+                idx["valid_mask"] = mask
+            scores[~mask] = 0
+            k = max_results
+        else:
+            k = max_results * 2
+
+        positive = np.nonzero(scores)[0]
+        if positive.size > k:
+            # Partial partition beats a full sort: only the top-k need order
+            positive = positive[np.argpartition(-scores[positive], k - 1)[:k]]
+        order = positive[np.argsort(-scores[positive], kind="stable")]
+        tpl_paths = idx["tpl_paths"]
+        return tuple(tpl_paths[i] for i in order)
+
+    def _scan_templates(self) -> Dict[str, TemplateRecord]:
+        """Load and validate every indexed template in one pass.
+
+        Returns a dict of template_path → TemplateRecord holding only
+        templates that exist on disk and pass SCL-format validation.
+        """
+        valid = {}
+        for template_path, meta in self.index.items():
+            if meta.get("alt_format"):
+                continue
+            full_path = self.templates_dir / template_path
+            if not full_path.exists():
+                continue
+            data = self._load_template(full_path)
+            if data is not None and self._is_scl_format(data):
+                valid[template_path] = TemplateRecord(
+                    path=template_path,
+                    data=data,
+                    category=meta.get("category", ""),
+                    complexity=meta.get("complexity", ""),
+                    keywords=tuple(meta["keywords"]),
+                    final_name=data.get("final_name", ""),
+                    is_scl=True,
+                )
+        return valid
+
+    def _get_valid_template(self, template_path: str) -> Optional[Dict]:
+        """Return validated template data, or None if missing/invalid."""
+        if self._valid_templates is not None:
+            record = self._valid_templates.get(template_path)
+            return record.data if record is not None else None
+        full_path = self.templates_dir / template_path
+        if not full_path.exists():
+            return None
+        data = self._load_template(full_path)
+        if data is None or not self._is_scl_format(data):
+            return None
+        return data
+
+    def _rank_templates(self, prompt_lower: str,
+                        max_results: int) -> Tuple[str, ...]:
+        """Score templates for *prompt_lower*; return top candidate paths."""
+        prompt_words = frozenset(_WORD_RE.findall(prompt_lower))
+
+        if self._numba_index is not None:
+            return self._rank_templates_numba(prompt_lower, prompt_words,
+                                              max_results)
+
+        scores = defaultdict(int)
+        for word in prompt_words:
+            for template_path, weight in self._token_postings.get(word, ()):
+                scores[template_path] += weight
+        if self._phrase_automaton is not None:
+            for _end, postings in self._phrase_automaton.iter(prompt_lower):
+                for template_path, weight in postings:
+                    scores[template_path] += weight
+        else:
+            for phrase, postings in self._phrase_postings.items():
+                if phrase in prompt_lower:
+                    for template_path, weight in postings:
+                        scores[template_path] += weight
+        for category, template_paths in self._category_index.items():
+            if category in prompt_words:
+                for template_path in template_paths:
+                    scores[template_path] += 2
+
+        if self._valid_templates is not None:
+            candidates = [item for item in scores.items()
+                          if item[0] in self._valid_templates]
+            k = max_results
+        else:
+            candidates = scores.items()
+            k = max_results * 2
+        top = heapq.nlargest(k, candidates, key=operator.itemgetter(1))
+        return tuple(tp for tp, _ in top)
 
     def find_relevant_templates(self, prompt: str, max_results: int = 3) -> List[Dict]:
         """Find most relevant templates for a given prompt using keyword scoring."""
         prompt_lower = prompt.lower()
-        prompt_words = set(re.findall(r'\b[a-z]+\b', prompt_lower))
-
-        scores = []
-        for template_path, meta in self.index.items():
-            score = 0
-
-            for keyword in meta["keywords"]:
-                kw_lower = keyword.lower()
-                if kw_lower in prompt_lower:
-                    word_count = len(kw_lower.split())
-                    score += 3 * word_count
-
-                kw_words = set(kw_lower.split())
-                matching_words = kw_words & prompt_words
-                if matching_words:
-                    score += len(matching_words)
-
-            if meta.get("category") and meta["category"] in prompt_lower:
-                score += 2
-
-            if score > 0:
-                scores.append((template_path, score, meta))
-
-        scores.sort(key=lambda x: x[1], reverse=True)
 
         results = []
         seen_categories = set()
 
-        for template_path, score, meta in scores[:max_results * 2]:
+        for template_path in self._rank_cached(prompt_lower, max_results):
+            meta = self.index[template_path]
             if len(results) >= max_results:
                 break
 
             if meta.get("alt_format"):
                 continue
 
-            full_path = self.templates_dir / template_path
-            if not full_path.exists():
-                continue
-
-            template_data = self._load_template(full_path)
+            template_data = self._get_valid_template(template_path)
             if template_data is None:
                 continue
 
-            if not self._is_scl_format(template_data):
-                continue
-
             results.append(template_data)
             seen_categories.add(meta.get("category", ""))
 
-        if not results:
-            default_path = self.templates_dir / "basic" / "cylinder_10x20.json"
-            if default_path.exists():
-                template_data = self._load_template(default_path)
-                if template_data:
-                    results.append(template_data)
+        if not results and self._default_template:
+            results.append(self._default_template)
 
         return results
 
@@ -565,47 +884,70 @@ class TemplateIndex:
         """Load a specific template by partial name match."""
         name_lower = name.lower().replace(" ", "_")
 
-        for template_path in self.index:
-            if name_lower in template_path.lower():
+        # Exact stem hit first — the common case, one dict lookup
+        template_path = self._stem_to_path.get(name_lower)
+        if template_path is not None:
+            full_path = self.templates_dir / template_path
+            if full_path.exists():
+                return self._load_template(full_path)
+
+        for path_lower, template_path in self._lower_paths:
+            if name_lower in path_lower:
                 full_path = self.templates_dir / template_path
                 if full_path.exists():
                     return self._load_template(full_path)
 
-        for json_file in self.templates_dir.rglob("*.json"):
+        if self._all_json_paths is None:
+            self._all_json_paths = list(self.templates_dir.rglob("*.json"))
+        for json_file in self._all_json_paths:
             if name_lower in json_file.stem.lower():
                 return self._load_template(json_file)
 
         return None
 
+    def reload(self):
+        """Re-scan the templates directory and drop all derived caches."""
+        _load_json_cached.cache_clear()
+        self._rank_cached.cache_clear()
+        self._all_json_paths = None
+        self._list_all_cache = None
+        self._complexity_cache.clear()
+        if self._numba_index is not None:
+            self._numba_index.pop("valid_mask", None)
+        if self._valid_templates is not None:
+            self._valid_templates = self._scan_templates()
+            self._template_names = self._collect_template_names()
+        else:
+            self._template_names = None
+
     def list_all_templates(self) -> List[Dict[str, str]]:
-        """List all available templates with metadata."""
-        result = []
-        for template_path, meta in self.index.items():
-            full_path = self.templates_dir / template_path
-            result.append({
-                "path": template_path,
-                "description": meta.get("description", ""),
-                "category": meta.get("category", ""),
-                "complexity": meta.get("complexity", ""),
-                "exists": full_path.exists(),
-                "scl_format": not meta.get("alt_format", False)
-            })
-        return result
+        """List all available templates with metadata (cached)."""
+        if self._list_all_cache is None:
+            result = []
+            for template_path, meta in self.index.items():
+                full_path = self.templates_dir / template_path
+                result.append({
+                    "path": template_path,
+                    "description": meta.get("description", ""),
+                    "category": meta.get("category", ""),
+                    "complexity": meta.get("complexity", ""),
+                    "exists": full_path.exists(),
+                    "scl_format": not meta.get("alt_format", False)
+                })
+            self._list_all_cache = result
+        return self._list_all_cache
 
     def _load_template(self, path: Path) -> Optional[Dict]:
-        """Load and cache a template file."""
-        str_path = str(path)
-        if str_path in self._loaded_cache:
-            return self._loaded_cache[str_path]
-
+        """Load a template through the shared process-wide cache."""
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-            self._loaded_cache[str_path] = data
-            return data
-        except (json.JSONDecodeError, FileNotFoundError) as e:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError as e:
             logger.warning(f"Failed to load template {path}: {e}")
             return None
+        return _load_json_cached(str(path), mtime_ns)
+
+    _GEOMETRY_KEYS = frozenset(
+        {"sketch", "revolve_profile", "hole_feature", "post_processing"})
 
     def _is_scl_format(self, data: Dict) -> bool:
         """Check if template uses SCL format (vs alternative formats)."""
@@ -613,25 +955,25 @@ class TemplateIndex:
         if not parts:
             return False
 
-        has_any_geometry = False
+        found_geometry = False
         for part_key, part_data in parts.items():
             if not part_key.startswith("part_"):
                 return False
             if not isinstance(part_data, dict):
                 return False
-            has_geometry = (
-                "sketch" in part_data
-                or "revolve_profile" in part_data
-                or "hole_feature" in part_data
-                or "post_processing" in part_data
-            )
-            if has_geometry:
-                has_any_geometry = True
+            # C-level dict-view intersection instead of four `in` checks;
+            # skip it once any geometry part has been seen.
+            if not found_geometry and part_data.keys() & self._GEOMETRY_KEYS:
+                found_geometry = True
 
-        return has_any_geometry
+        return found_geometry
 
     def get_complexity_examples(self, target_complexity: str = "moderate") -> List[Dict]:
-        """Get templates matching a complexity level."""
+        """Get templates matching a complexity level (cached)."""
+        cached = self._complexity_cache.get(target_complexity)
+        if cached is not None:
+            return cached
+
         results = []
         for template_path, meta in self.index.items():
             if meta.get("complexity") == target_complexity and not meta.get("alt_format"):
@@ -640,16 +982,13 @@ class TemplateIndex:
                     data = self._load_template(full_path)
                     if data and self._is_scl_format(data):
                         results.append(data)
+        self._complexity_cache[target_complexity] = results
         return results
 
-    def get_template_names(self) -> set:
-        """Return a set of all known template ``final_name`` values.
-
-        Useful for deduplication when merging keyword results with RAG
-        results in the pipeline.
-        """
+    def _collect_template_names(self) -> frozenset:
+        """Gather all ``final_name`` values from indexed templates."""
         names = set()
-        for template_path, meta in self.index.items():
+        for template_path in self.index:
             full_path = self.templates_dir / template_path
             if full_path.exists():
                 data = self._load_template(full_path)
@@ -657,4 +996,15 @@ class TemplateIndex:
                     name = data.get("final_name", "")
                     if name:
                         names.add(name)
-        return names
+        return frozenset(names)
+
+    def get_template_names(self) -> frozenset:
+        """Return the set of all known template ``final_name`` values.
+
+        Useful for deduplication when merging keyword results with RAG
+        results in the pipeline. Computed once (eagerly unless the index
+        was built with lazy=True) and returned as a frozenset.
+        """
+        if self._template_names is None:
+            self._template_names = self._collect_template_names()
+        return self._template_names
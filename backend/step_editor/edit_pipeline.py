@@ -10,6 +10,7 @@ The original STEP geometry is never discarded.  Only the specific face(s)
 mentioned in the prompt are modified in-place via OpenCASCADE defeaturing +
 re-cut operations.
 """
+import asyncio
 import os
 import re
 import sys
@@ -23,7 +24,7 @@ from typing import Dict, Any, Optional
 sys.path.append(str(Path(__file__).parent.parent))
 
 from step_editor import step_analyzer
-from step_editor.step_executor import execute_edit_from_prompt
+from step_editor.step_executor import execute_edit_from_prompt, execute_batch_from_prompts
 from core import config
 
 logger = logging.getLogger(__name__)
@@ -77,3 +78,74 @@ def edit_step(step_path: str, user_prompt: str, open_freecad: bool = False, prov
 
     logger.info(f"[EditPipeline] Done. Status: {result.get('status')}")
     return result
+
+
+def edit_step_batch(step_path: str, user_prompts: list, open_freecad: bool = False,
+                    provider: str = 'gemini') -> Dict[str, Any]:
+    """
+    Apply several edit prompts to one STEP file in a single pass.
+
+    Geometry is analyzed once and all prompts go to the LLM in one
+    numbered request, so the per-edit cost drops to roughly 1/N of
+    issuing them individually. Same result contract as edit_step.
+    """
+    logger.info(f"[EditPipeline] Batch BREP edit: {len(user_prompts)} prompt(s) on {step_path}")
+
+    logger.info("[EditPipeline] Step 1: Analyzing geometry...")
+    try:
+        features = step_analyzer.analyze(step_path)
+    except Exception as e:
+        return {"status": "error", "error": {"code": "ANALYSIS_FAILED", "message": str(e)}}
+
+    logger.info("[EditPipeline] Step 2: Applying batched BREP edits...")
+    try:
+        result = execute_batch_from_prompts(
+            step_path,
+            user_prompts,
+            pre_analyzed_features=features,
+            provider=provider,
+        )
+    except Exception as e:
+        logger.error(f"[EditPipeline] Batch BREP edit failed: {e}")
+        return {"status": "error", "error": {"code": "BREP_EDIT_FAILED", "message": str(e)}}
+
+    result["features"] = features
+
+    logger.info(f"[EditPipeline] Done. Status: {result.get('status')}")
+    return result
+
+
+async def edit_step_async(step_path: str, user_prompt: str,
+                          open_freecad: bool = False,
+                          provider: str = 'gemini') -> Dict[str, Any]:
+    """Async sibling of edit_step with identical semantics.
+
+    Both stages block for seconds (OCCT import/analysis is C-bound, the
+    LLM call is network-bound), so each runs in a worker thread and the
+    event loop stays free to interleave concurrent edit requests.
+    """
+    logger.info(f"[EditPipeline] Lossless BREP edit (async): '{user_prompt}' on {step_path}")
+
+    logger.info("[EditPipeline] Step 1: Analyzing geometry...")
+    try:
+        features = await asyncio.to_thread(step_analyzer.analyze, step_path)
+    except Exception as e:
+        return {"status": "error", "error": {"code": "ANALYSIS_FAILED", "message": str(e)}}
+
+    logger.info("[EditPipeline] Step 2: Applying direct BREP edit...")
+    try:
+        result = await asyncio.to_thread(
+            execute_edit_from_prompt,
+            step_path,
+            user_prompt,
+            pre_analyzed_features=features,
+            provider=provider,
+        )
+    except Exception as e:
+        logger.error(f"[EditPipeline] BREP edit failed: {e}")
+        return {"status": "error", "error": {"code": "BREP_EDIT_FAILED", "message": str(e)}}
+
+    result["features"] = features
+
+    logger.info(f"[EditPipeline] Done. Status: {result.get('status')}")
+    return result
@@ -0,0 +1,47 @@
+"""Intent Classifier - cheap routing gate for STEP edit prompts.
+
+Decides whether an edit prompt can be handled by the deterministic
+local action builders in step_executor or needs the full LLM mapping.
+Pure keyword/regex scoring: well under 1ms on CPU, no model downloads,
+no extra dependencies.
+"""
+import re
+
+# Routing labels
+LLM_REQUIRED     = "llm_required"
+LOCAL_RESIZE     = "local_resize"
+LOCAL_DEFEATURE  = "local_defeature"
+LOCAL_REPOSITION = "local_reposition"
+LOCAL_EXTRUDE    = "local_extrude"
+
+_FACE_ID_RE = re.compile(r'\bf\d+\b', re.IGNORECASE)
+
+# Conjunctions / separators that signal a compound request ("resize f5
+# and delete f2") -- those always need the LLM's multi-action mapping.
+# Commas between digits are coordinate separators, not clause breaks.
+_MULTI_CLAUSE_RE = re.compile(
+    r'\b(?:and|then|also|plus)\b|;|(?<!\d)\s*,(?!\s*-?\d)', re.IGNORECASE)
+
+_VERB_INTENTS = (
+    (re.compile(r'\b(?:resize|enlarge|shrink|widen|change|set|make)\b', re.IGNORECASE), LOCAL_RESIZE),
+    (re.compile(r'\b(?:delete|remove|defeature)\b', re.IGNORECASE), LOCAL_DEFEATURE),
+    (re.compile(r'\b(?:move|reposition|relocate)\b', re.IGNORECASE), LOCAL_REPOSITION),
+    (re.compile(r'\bextrude\b', re.IGNORECASE), LOCAL_EXTRUDE),
+)
+
+
+def classify(prompt: str) -> str:
+    """Return the routing intent label for *prompt*.
+
+    Conservative by design: anything compound, anything without an
+    explicit face ID, or anything whose verb is ambiguous falls back to
+    LLM_REQUIRED. A local_* label only means the deterministic builders
+    are worth trying -- they still re-verify with strict patterns.
+    """
+    text = prompt.strip()
+    if not _FACE_ID_RE.search(text) or _MULTI_CLAUSE_RE.search(text):
+        return LLM_REQUIRED
+    for pattern, intent in _VERB_INTENTS:
+        if pattern.search(text):
+            return intent
+    return LLM_REQUIRED
@@ -0,0 +1,137 @@
+"""Semantic cache for STEP-edit LLM calls.
+
+Maps (geometry-context bucket, user prompt) → raw LLM response so that
+repeated edits on the same model skip the network round-trip entirely.
+
+Lookup is two-tier:
+    1. exact match on the normalized prompt (always available), then
+    2. cosine similarity over MiniLM embeddings within the same bucket
+       (only when sentence-transformers is installed — it is an optional
+       dependency shared with the RAG stack).
+
+The bucket key is a hash of the full static context (system prompt +
+serialized features), so a cached answer is only ever reused against
+identical geometry.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from math import sqrt
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_ENABLED = True
+except ImportError:
+    EMBEDDINGS_ENABLED = False
+
+SIMILARITY_THRESHOLD = 0.92
+_EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def bucket_key(*context_parts: str) -> str:
+    """Hash the static context (system prompt, features JSON, ...) to a bucket."""
+    h = hashlib.sha256()
+    for part in context_parts:
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    na = sqrt(sum(x * x for x in a))
+    nb = sqrt(sum(x * x for x in b))
+    if na == 0.0 or nb == 0.0:
+        return 0.0
+    return dot / (na * nb)
+
+
+class LLMCache:
+    """SQLite-backed prompt→response cache with semantic lookup."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            from core import config
+            db_path = config.DATA_DIR / "llm_edit_cache.db"
+        self._db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._embedder = None
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " bucket TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " embedding BLOB,"
+            " response TEXT NOT NULL,"
+            " PRIMARY KEY (bucket, prompt))"
+        )
+        self._conn.commit()
+
+    # ── embeddings ────────────────────────────────────────────────────────
+
+    def _embed(self, text: str) -> Optional[array]:
+        """Embed *text* with MiniLM; None when embeddings are unavailable."""
+        if not EMBEDDINGS_ENABLED:
+            return None
+        if self._embedder is None:
+            try:
+                self._embedder = SentenceTransformer(_EMBED_MODEL_NAME)
+            except Exception as e:
+                logger.warning("Embedding model unavailable: %s", e)
+                return None
+        vec = self._embedder.encode(text, normalize_embeddings=False)
+        return array("f", (float(v) for v in vec))
+
+    # ── public API ────────────────────────────────────────────────────────
+
+    def get(self, bucket: str, prompt: str) -> Optional[str]:
+        """Return a cached response for (bucket, prompt), or None."""
+        norm_prompt = " ".join(prompt.lower().split())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM entries WHERE bucket=? AND prompt=?",
+                (bucket, norm_prompt),
+            ).fetchone()
+            if row is not None:
+                logger.info("[LLMCache] Exact hit for bucket %s", bucket[:12])
+                return row[0]
+
+            query_vec = self._embed(norm_prompt)
+            if query_vec is None:
+                return None
+
+            best_score, best_response = 0.0, None
+            for embedding, response in self._conn.execute(
+                "SELECT embedding, response FROM entries WHERE bucket=?"
+                " AND embedding IS NOT NULL",
+                (bucket,),
+            ):
+                cached_vec = array("f")
+                cached_vec.frombytes(embedding)
+                score = _cosine(query_vec, cached_vec)
+                if score > best_score:
+                    best_score, best_response = score, response
+
+        if best_response is not None and best_score >= SIMILARITY_THRESHOLD:
+            logger.info("[LLMCache] Semantic hit (%.3f) for bucket %s",
+                        best_score, bucket[:12])
+            return best_response
+        return None
+
+    def put(self, bucket: str, prompt: str, response: str) -> None:
+        """Store a response; overwrites any stale entry for the same prompt."""
+        norm_prompt = " ".join(prompt.lower().split())
+        vec = self._embed(norm_prompt)
+        blob = vec.tobytes() if vec is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (bucket, prompt, embedding,"
+                " response) VALUES (?, ?, ?, ?)",
+                (bucket, norm_prompt, blob, response),
+            )
+            self._conn.commit()
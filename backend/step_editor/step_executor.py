@@ -1,3 +1,4 @@
+import io
 import os
 import re
 import sys
@@ -14,12 +15,35 @@ from OCP.TopTools import TopTools_ListOfShape
 from OCP.BRepPrimAPI import BRepPrimAPI_MakePrism
 from OCP.gp import gp_Vec
 
+try:
+    import orjson
+    ORJSON_ENABLED = True
+except ImportError:
+    ORJSON_ENABLED = False
+
 from step_editor import step_analyzer
+from step_editor import intent_classifier
+from step_editor import llm_cache
 from core import config
 from utils.logger import setup_logger
 
 logger = setup_logger('synthocad.step_editor', 'step_editor.log')
 
+# orjson is 2-5x faster for the per-edit features dump and response
+# parse; its JSONDecodeError subclasses json.JSONDecodeError, so the
+# existing except clauses keep working.
+if ORJSON_ENABLED:
+    def _dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    _loads = orjson.loads
+else:
+    def _dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+    _loads = json.loads
+
+# Shared semantic cache for the action-LLM calls (exact + embedding hits)
+_llm_cache = llm_cache.LLMCache()
+
 # ---------------------------------------------------------------------------
 # Isolated boolean helper
 # ---------------------------------------------------------------------------
@@ -256,128 +280,253 @@ def _isolated_create(
             except OSError: pass
 
 
-def _get_action_from_llm(prompt: str, features: dict, provider: str = 'gemini') -> list:
-    sys.path.append(str(Path(__file__).parent.parent))
-
-    if provider == 'ollama':
-        from services.ollama_service import call_ollama as _call_llm
-        _kwargs = {'model': 'qwen2.5:7b', 'temperature': 0.0}
-        _provider_label = 'Qwen (Ollama)'
-    else:
-        from services.gemini_service import call_gemini as _call_llm
-        _kwargs = {'temperature': 0.0, 'json_mode': True}
-        _provider_label = 'Gemini'
-
-    context_str = json.dumps(features, indent=2)
-    context_bytes = len(context_str.encode())
-    logger.info(f"[LLM] Sending context: {context_bytes} bytes, "
-                f"{len(features.get('cylinders', []))} cyls, "
-                f"{len(features.get('planes', []))} planes")
-
-    system_prompt = f"""You must output ONLY the raw JSON array. No explanation, no markdown, no prose.
+# Static instruction block for the action-LLM. Kept free of per-call data
+# so it can be uploaded once to Gemini's context cache and referenced by
+# handle; only the features + user request travel with each call.
+EDIT_SYSTEM_PROMPT = """You must output ONLY the raw JSON array. No explanation, no markdown, no prose.
     You are a CAD editing assistant mapping user text directly to a geometric operation.
-    Given this dictionary of existing geometric features in the model:
-    {context_str}
-    
-    And the user's edit prompt:
-    "{prompt}"
-    
+    You will be given a dictionary of existing geometric features in the model and the
+    user's edit prompt.
+
     Return a strictly formatted JSON array of action objects. Support multiple faces if asked!
     Supported actions:
-    
+
     1. Resize a Hole (internal cylinder, e.g. bore/through-hole):
-    {{"action": "resize_hole", "face_id": "f5", "new_radius": 3.0}}
-    
+    {"action": "resize_hole", "face_id": "f5", "new_radius": 3.0}
+
     2. Resize an external Shaft / Boss / Cylinder:
-    {{"action": "resize_hole", "face_id": "f10", "new_radius": 1.0}}
+    {"action": "resize_hole", "face_id": "f10", "new_radius": 1.0}
     (Use the same action for both — the system detects hole vs shaft automatically.)
-    
+
     3. Defeature (Delete a feature entirely):
-    {{"action": "defeature", "face_id": "f12"}}
-    
+    {"action": "defeature", "face_id": "f12"}
+
     4. Extrude / Move a Planar Face (to change block dimensions, etc.):
-    {{"action": "extrude_face", "face_id": "f4", "distance": 5.0}}
+    {"action": "extrude_face", "face_id": "f4", "distance": 5.0}
     (Positive distance pushes outward adding volume. Negative distance pushes inward cutting volume.)
-    
+
     5. Reposition a Hole or Cylinder / Cone to a new XYZ location (keeps all other geometry):
-    {{"action": "reposition", "face_id": "f5", "new_location": [x, y, z]}}
+    {"action": "reposition", "face_id": "f5", "new_location": [x, y, z]}
     The axis direction is preserved; only the centre position moves.
-    
+
     6. Create a brand-new Cylinder or cylindrical Hole at any position:
-    {{"action": "create_cylinder", "location": [x, y, z], "axis": [0, 0, 1], "radius": 5.0, "height": 20.0, "is_hole": false}}
+    {"action": "create_cylinder", "location": [x, y, z], "axis": [0, 0, 1], "radius": 5.0, "height": 20.0, "is_hole": false}
     Set "is_hole": true to cut a hole, false to add a solid boss/cylinder.
-    
+
     7. Create a brand-new Cone or conical Hole at any position:
-    {{"action": "create_cone", "location": [x, y, z], "axis": [0, 0, 1], "base_radius": 10.0, "top_radius": 0.0, "height": 15.0, "is_hole": false}}
+    {"action": "create_cone", "location": [x, y, z], "axis": [0, 0, 1], "base_radius": 10.0, "top_radius": 0.0, "height": 15.0, "is_hole": false}
     "top_radius": 0.0 = sharp tip; >0 = frustum (truncated cone). Set "is_hole": true to cut.
-    
+
     MULTI-OPERATION EXAMPLES — when the prompt mentions more than one change, always return
     ALL operations as a single JSON array in execution order:
 
     Example A — resize two faces:
-    [{{"action": "resize_hole", "face_id": "f3", "new_radius": 5.0}},
-     {{"action": "resize_hole", "face_id": "f9", "new_radius": 2.5}}]
+    [{"action": "resize_hole", "face_id": "f3", "new_radius": 5.0},
+     {"action": "resize_hole", "face_id": "f9", "new_radius": 2.5}]
 
     Example B — resize then reposition:
-    [{{"action": "resize_hole", "face_id": "f3", "new_radius": 6.0}},
-     {{"action": "reposition", "face_id": "f3", "new_location": [10.0, 15.0, 0.0]}}]
+    [{"action": "resize_hole", "face_id": "f3", "new_radius": 6.0},
+     {"action": "reposition", "face_id": "f3", "new_location": [10.0, 15.0, 0.0]}]
 
     Example C — delete a feature, create a new cylinder, add a conical hole:
-    [{{"action": "defeature", "face_id": "f12"}},
-     {{"action": "create_cylinder", "location": [0, 0, 5], "axis": [0, 0, 1], "radius": 8.0, "height": 20.0, "is_hole": false}},
-     {{"action": "create_cone", "location": [0, 0, 25], "axis": [0, 0, 1], "base_radius": 8.0, "top_radius": 0.0, "height": 10.0, "is_hole": true}}]
+    [{"action": "defeature", "face_id": "f12"},
+     {"action": "create_cylinder", "location": [0, 0, 5], "axis": [0, 0, 1], "radius": 8.0, "height": 20.0, "is_hole": false},
+     {"action": "create_cone", "location": [0, 0, 25], "axis": [0, 0, 1], "base_radius": 8.0, "top_radius": 0.0, "height": 10.0, "is_hole": true}]
 
     Example D — move a boss and extrude a face:
-    [{{"action": "reposition", "face_id": "f7", "new_location": [20.0, 0.0, 0.0]}},
-     {{"action": "extrude_face", "face_id": "f4", "distance": 5.0}}]
+    [{"action": "reposition", "face_id": "f7", "new_location": [20.0, 0.0, 0.0]},
+     {"action": "extrude_face", "face_id": "f4", "distance": 5.0}]
 
     CRITICAL: If the user describes N distinct changes, return EXACTLY N action objects in the array.
     Never collapse multiple requested operations into one. Never omit any operation the user stated.
     Output ONLY the raw JSON array. No markdown, no explanation, no prose.
     """
-    
+
+
+# Constant prompt segments, built once at import. _build_edit_prompt
+# only streams the per-call data between them instead of re-formatting
+# the surrounding text on every edit.
+_TAIL_FEATURES_HEADER = (
+    "\n    Dictionary of existing geometric features in the model:\n    "
+)
+_TAIL_USER_HEADER = '\n\n    The user\'s edit prompt:\n    "'
+_TAIL_FOOTER = '"\n\n    Return the JSON array of action objects now.\n'
+
+
+def _build_edit_prompt(prompt: str, context_str: str) -> str:
+    """Build the dynamic tail: features + user request (static-first order)."""
+    buf = io.StringIO()
+    buf.write(_TAIL_FEATURES_HEADER)
+    buf.write(context_str)
+    buf.write(_TAIL_USER_HEADER)
+    buf.write(prompt)
+    buf.write(_TAIL_FOOTER)
+    return buf.getvalue()
+
+
+# Structural spec for each supported action: required fields and their
+# types. Checked immediately after parsing so malformed LLM output is
+# rejected in microseconds with a precise message instead of failing
+# deep inside execute_action (possibly after an expensive boolean op).
+_NUMBER = (int, float)
+_ACTION_SPECS = {
+    "resize_hole":     {"face_id": str, "new_radius": _NUMBER},
+    "defeature":       {"face_id": str},
+    "extrude_face":    {"face_id": str, "distance": _NUMBER},
+    "reposition":      {"face_id": str, "new_location": list},
+    "create_cylinder": {"radius": _NUMBER, "height": _NUMBER},
+    "create_cone":     {"base_radius": _NUMBER, "height": _NUMBER},
+}
+
+
+def _validate_actions(actions: list) -> list:
+    """Fast structural precheck of a parsed action list.
+
+    Raises ValueError naming the offending action and field; returns the
+    list unchanged when valid.
+    """
+    if not isinstance(actions, list) or not actions:
+        raise ValueError("LLM output must be a non-empty JSON array of action objects.")
+    for idx, cmd in enumerate(actions):
+        if not isinstance(cmd, dict):
+            raise ValueError(f"Action {idx} is not a JSON object: {cmd!r}")
+        spec = _ACTION_SPECS.get(cmd.get("action"))
+        if spec is None:
+            raise ValueError(
+                f"Action {idx} has unsupported action {cmd.get('action')!r}. "
+                f"Supported: {sorted(_ACTION_SPECS)}"
+            )
+        for field, types in spec.items():
+            if field not in cmd:
+                raise ValueError(f"Action {idx} ({cmd['action']}) is missing required field {field!r}")
+            if not isinstance(cmd[field], types) or isinstance(cmd[field], bool):
+                raise ValueError(
+                    f"Action {idx} ({cmd['action']}) field {field!r} has wrong type: {cmd[field]!r}"
+                )
+        if cmd["action"] == "reposition" and len(cmd["new_location"]) != 3:
+            raise ValueError(f"Action {idx} (reposition) 'new_location' must be [x, y, z]")
+    return actions
+
+
+# Markdown code-fence stripper, compiled once (the per-call split()
+# chains scanned the response several times).
+_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+
+def _extract_json(s: str, open_ch: str, close_ch: str):
+    """Return the first balanced top-level JSON span, or None.
+
+    Single linear pass with a depth counter -- no regex backtracking,
+    which matters on long (or malformed) LLM responses.
+    """
+    start = s.find(open_ch)
+    if start < 0:
+        return None
+    depth = 0
+    for i in range(start, len(s)):
+        c = s[i]
+        if c == open_ch:
+            depth += 1
+        elif c == close_ch:
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return s[start:]
+
+
+def _parse_actions(response_text: str) -> list:
+    """Parse an LLM response into a validated action list.
+
+    Strips code fences, attempts a direct JSON parse, then falls back to
+    scanning for the first balanced array or object. Raises on anything
+    that does not yield valid actions.
+    """
+    json_str = response_text
+    fence = _FENCE_RE.search(json_str)
+    if fence:
+        json_str = fence.group(1)
+        logger.debug("[LLM] Stripped code fences")
+
+    json_str = json_str.strip()
+    logger.debug(f"[LLM] JSON string to parse: {json_str!r}")
+
     try:
-        logger.info(f"[LLM] Calling {_provider_label}...")
-        response_text = _call_llm(system_prompt, **_kwargs)
+        parsed = _loads(json_str)
+        result = parsed if isinstance(parsed, list) else [parsed]
+        logger.info(f"[LLM] Parsed actions: {result}")
+        return _validate_actions(result)
+    except json.JSONDecodeError as je:
+        logger.warning(f"[LLM] Direct JSON parse failed ({je}), trying fallback search")
+        # Fallback: linear scan for the first balanced array or object
+        extracted = _extract_json(response_text, '[', ']')
+        if extracted is not None:
+            logger.info(f"[LLM] Fallback array extract: {extracted!r}")
+            result = _loads(extracted)
+            logger.info(f"[LLM] Fallback parsed actions: {result}")
+            return _validate_actions(result)
+        extracted = _extract_json(response_text, '{', '}')
+        if extracted is not None:
+            logger.info(f"[LLM] Fallback object extract: {extracted!r}")
+            result = [_loads(extracted)]
+            logger.info(f"[LLM] Fallback parsed actions: {result}")
+            return _validate_actions(result)
+        raise ValueError("No JSON array/object found in LLM response.")
+
+
+def _get_action_from_llm(prompt: str, features: dict, provider: str = 'gemini') -> list:
+    sys.path.append(str(Path(__file__).parent.parent))
+
+    cached_content = None
+    if provider == 'ollama':
+        from services.ollama_service import call_ollama as _call_llm
+        _kwargs = {'model': 'qwen2.5:7b', 'temperature': 0.0}
+        _provider_label = 'Qwen (Ollama)'
+    else:
+        from services.gemini_service import call_gemini as _call_llm
+        from services.gemini_service import create_cached_content
+        _kwargs = {'temperature': 0.0, 'json_mode': True}
+        _provider_label = 'Gemini'
+        cached_content = create_cached_content(EDIT_SYSTEM_PROMPT)
+
+    context_str = _dumps_pretty(features)
+    context_bytes = len(context_str.encode())
+    logger.info(f"[LLM] Sending context: {context_bytes} bytes, "
+                f"{len(features.get('cylinders', []))} cyls, "
+                f"{len(features.get('planes', []))} planes")
+
+    dynamic_tail = _build_edit_prompt(prompt, context_str)
+    if cached_content is not None:
+        # Static block lives server-side; only send the dynamic tail
+        system_prompt = dynamic_tail
+        _kwargs['cached_content'] = cached_content
+    else:
+        system_prompt = EDIT_SYSTEM_PROMPT + dynamic_tail
+
+    # Same geometry + same provider + same system prompt → same bucket;
+    # identical or near-identical prompts short-circuit the network call
+    # entirely. Keying on EDIT_SYSTEM_PROMPT means any change to the
+    # action contract invalidates every previously cached response.
+    cache_bucket = llm_cache.bucket_key(
+        _provider_label, EDIT_SYSTEM_PROMPT, context_str)
+
+    try:
+        response_text = _llm_cache.get(cache_bucket, prompt)
+        from_cache = response_text is not None
+        if from_cache:
+            logger.info(f"[LLM] Cache hit -- skipping {_provider_label} call")
+        else:
+            logger.info(f"[LLM] Calling {_provider_label}...")
+            response_text = _call_llm(system_prompt, **_kwargs)
         logger.info(f"[LLM] Raw response ({len(response_text)} chars): {response_text!r}")
-        
-        json_str = response_text
-        if "```json" in json_str:
-            json_str = json_str.split("```json")[1].split("```")[0]
-            logger.debug("[LLM] Stripped ```json fences")
-        elif "```" in json_str:
-            json_str = json_str.split("```")[1].split("```")[0]
-            logger.debug("[LLM] Stripped ``` fences")
-            
-        json_str = json_str.strip()
-        logger.debug(f"[LLM] JSON string to parse: {json_str!r}")
-        
-        try:
-            parsed = json.loads(json_str)
-            result = parsed if isinstance(parsed, list) else [parsed]
-            logger.info(f"[LLM] Parsed actions: {result}")
-            return result
-        except json.JSONDecodeError as je:
-            logger.warning(f"[LLM] Direct JSON parse failed ({je}), trying fallback search")
-            # Fallback search for list or dict
-            start = response_text.find('[')
-            end = response_text.rfind(']')
-            if start != -1 and end != -1:
-                extracted = response_text[start:end+1]
-                logger.info(f"[LLM] Fallback array extract: {extracted!r}")
-                result = json.loads(extracted)
-                logger.info(f"[LLM] Fallback parsed actions: {result}")
-                return result
-            start = response_text.find('{')
-            end = response_text.rfind('}')
-            if start != -1 and end != -1:
-                extracted = response_text[start:end+1]
-                logger.info(f"[LLM] Fallback object extract: {extracted!r}")
-                result = [json.loads(extracted)]
-                logger.info(f"[LLM] Fallback parsed actions: {result}")
-                return result
-            raise ValueError("No JSON array/object found in LLM response.")
-            
+
+        actions = _parse_actions(response_text)
+        # Cache only after parsing and validation succeed: a truncated or
+        # refused response must not be frozen into the persistent cache,
+        # where every retry (and every similar prompt) would replay it.
+        if not from_cache:
+            _llm_cache.put(cache_bucket, prompt, response_text)
+        return actions
+
     except Exception as e:
         logger.error(f"[LLM] Failed to get action from LLM: {e}", exc_info=True)
         raise ValueError(f"Failed to interpret edit prompt using LLM: {e}")
@@ -387,13 +536,164 @@ def _get_action_from_llm(prompt: str, features: dict, provider: str = 'gemini')
 _MAX_LLM_CYLINDERS = 80
 _MAX_LLM_PLANES    = 30
 
+# Above these counts the per-face enumeration dominates prompt size, so
+# the auto detail level switches to the aggregated summary view.
+_SUMMARY_CYLS   = 20
+_SUMMARY_PLANES = 15
+
+# ---------------------------------------------------------------------------
+# Per-file edit history (previous-state context for the LLM)
+# ---------------------------------------------------------------------------
+_HISTORY_DIR = config.DATA_DIR / "edit_history"
+_MAX_HISTORY = 5
+
+
+def _history_path(step_path: str) -> Path:
+    return _HISTORY_DIR / f"{llm_cache.bucket_key(str(step_path))[:16]}.json"
+
+
+def _load_edit_history(step_path: str) -> list:
+    """Previously applied (prompt, actions) pairs for this file, oldest first."""
+    try:
+        return _loads(_history_path(step_path).read_bytes())
+    except (OSError, ValueError):
+        return []
+
+
+def _record_edit(step_path: str, prompt: str, commands: list) -> None:
+    """Append a successful edit to the file's history (bounded)."""
+    try:
+        history = _load_edit_history(step_path)
+        history.append({"prompt": prompt, "actions": commands})
+        history = history[-_MAX_HISTORY:]
+        _HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+        blob = (orjson.dumps(history) if ORJSON_ENABLED
+                else json.dumps(history).encode("utf-8"))
+        _history_path(step_path).write_bytes(blob)
+    except OSError as e:
+        logger.warning("Could not record edit history: %s", e)
+
+
+def _summarize_features(features: dict) -> dict:
+    """Aggregate per-face enumeration into grouped context for the LLM.
+
+    On dense parts (hundreds of identical holes) the full cylinder/plane
+    dump explodes the prompt to tens of KB. Grouping by radius/hole-ness
+    and by plane orientation cuts that 10-50x while keeping enough face
+    IDs per group for the LLM to emit valid actions.
+    """
+    cyl_groups = {}
+    for c in features.get("cylinders", []):
+        key = (c["radius_mm"], bool(c.get("is_hole")))
+        g = cyl_groups.setdefault(key, {
+            "radius_mm": key[0], "is_hole": key[1],
+            "count": 0, "face_ids": [], "locations": [],
+        })
+        g["count"] += 1
+        if len(g["face_ids"]) < 20:
+            g["face_ids"].append(c["id"])
+        if len(g["locations"]) < 5:
+            g["locations"].append(c["location"])
+
+    plane_groups = {}
+    for p in features.get("planes", []):
+        g = plane_groups.setdefault(p["face_type"], {
+            "face_type": p["face_type"],
+            "count": 0, "unique_dims": [], "face_ids": [],
+        })
+        g["count"] += 1
+        if p["dims"] not in g["unique_dims"] and len(g["unique_dims"]) < 10:
+            g["unique_dims"].append(p["dims"])
+        if len(g["face_ids"]) < 20:
+            g["face_ids"].append(p["id"])
+
+    return {
+        "bounding_box": features.get("bounding_box", {}),
+        "cylinder_groups": list(cyl_groups.values()),
+        "plane_groups": list(plane_groups.values()),
+        "summary": features.get("summary", ""),
+        "_note": (
+            "Aggregated view: faces are grouped by radius / orientation. "
+            "Pick a face_id from the matching group's face_ids list."
+        ),
+    }
+
+# ---------------------------------------------------------------------------
+# Deterministic fast path for simple single-action prompts
+# ---------------------------------------------------------------------------
+_NUM = r'(-?\d+(?:\.\d+)?)'
+
+# Each pattern must match the ENTIRE (normalized) prompt so compound or
+# ambiguous requests always fall through to the LLM.
+_LOCAL_RESIZE_RE = re.compile(
+    r'(?:resize|change|set|make)\s+(?:the\s+)?(?:hole|cylinder|shaft|boss|face)?\s*'
+    r'(f\d+)\s*(?:\'s)?\s*(radius|diameter)?\s*(?:to|=)\s*' + _NUM + r'\s*(?:mm)?',
+    re.IGNORECASE)
+_LOCAL_DEFEATURE_RE = re.compile(
+    r'(?:delete|remove|defeature)\s+(?:the\s+)?(?:hole|cylinder|feature|face)?\s*(f\d+)',
+    re.IGNORECASE)
+_LOCAL_MOVE_RE = re.compile(
+    r'(?:move|reposition)\s+(?:the\s+)?(?:hole|cylinder|shaft|boss|face)?\s*(f\d+)\s+to\s*'
+    r'\(?\s*' + _NUM + r'\s*,\s*' + _NUM + r'\s*,\s*' + _NUM + r'\s*\)?',
+    re.IGNORECASE)
+_LOCAL_EXTRUDE_RE = re.compile(
+    r'extrude\s+(?:face\s+)?(f\d+)\s+(?:by\s+)?' + _NUM + r'\s*(?:mm)?',
+    re.IGNORECASE)
+
+
+def _try_local_actions(prompt: str, features: dict) -> List[dict] | None:
+    """Map trivially parametric prompts straight to an action list.
+
+    Recognizes single-action prompts that name an explicit face ID
+    ("resize f5 to 3mm", "delete f12", "move f5 to (10, 0, 5)",
+    "extrude f4 by 2") so the round-trip through the LLM is skipped
+    entirely. Returns None for anything not matched with certainty —
+    compound prompts, natural-language face references, etc.
+    """
+    text = prompt.strip().rstrip('.')
+    cyl_ids = {c["id"] for c in features.get("cylinders", [])}
+    plane_ids = {p["id"] for p in features.get("planes", [])}
+
+    m = _LOCAL_RESIZE_RE.fullmatch(text)
+    if m:
+        face_id, dim, value = m.group(1).lower(), m.group(2), float(m.group(3))
+        if face_id in cyl_ids and value > 0:
+            radius = value / 2.0 if dim and dim.lower() == "diameter" else value
+            return [{"action": "resize_hole", "face_id": face_id, "new_radius": radius}]
+        return None
+
+    m = _LOCAL_DEFEATURE_RE.fullmatch(text)
+    if m:
+        face_id = m.group(1).lower()
+        if face_id in cyl_ids or face_id in plane_ids:
+            return [{"action": "defeature", "face_id": face_id}]
+        return None
+
+    m = _LOCAL_MOVE_RE.fullmatch(text)
+    if m:
+        face_id = m.group(1).lower()
+        if face_id in cyl_ids:
+            new_loc = [float(m.group(2)), float(m.group(3)), float(m.group(4))]
+            return [{"action": "reposition", "face_id": face_id, "new_location": new_loc}]
+        return None
+
+    m = _LOCAL_EXTRUDE_RE.fullmatch(text)
+    if m:
+        face_id = m.group(1).lower()
+        if face_id in plane_ids:
+            return [{"action": "extrude_face", "face_id": face_id, "distance": float(m.group(2))}]
+        return None
+
+    return None
+
 
 def _face_ids_in_prompt(prompt: str) -> Set[str]:
     """Return the set of face IDs (e.g. 'f49', 'f0') explicitly named in the prompt."""
     return {m.lower() for m in re.findall(r'\bf\d+\b', prompt, re.IGNORECASE)}
 
 
-def execute_edit_from_prompt(step_path: str, prompt: str, pre_analyzed_features: dict = None, provider: str = 'gemini') -> Dict[str, Any]:
+def execute_edit_from_prompt(step_path: str, prompt: str, pre_analyzed_features: dict = None,
+                             provider: str = 'gemini', detail_level: str = 'auto') -> Dict[str, Any]:
     logger.info(f"[Pipeline] execute_edit_from_prompt: prompt={prompt!r}, step={step_path}")
 
     if pre_analyzed_features:
@@ -411,6 +711,20 @@ def execute_edit_from_prompt(step_path: str, prompt: str, pre_analyzed_features:
         f"{len(all_cyls)} cylinders, {len(all_planes)} planes"
     )
 
+    # Deterministic fast path: the intent classifier gates which prompts
+    # are even worth trying locally; matched ones map straight to
+    # actions with no LLM round-trip.
+    intent = intent_classifier.classify(prompt)
+    logger.info(f"[Pipeline] Classified intent: {intent}")
+    if intent != intent_classifier.LLM_REQUIRED:
+        local_commands = _try_local_actions(prompt, features)
+        if local_commands is not None:
+            logger.info(f"[Pipeline] Local fast path matched, skipping LLM: {local_commands}")
+            result = execute_action(step_path, local_commands, features)
+            _record_edit(step_path, prompt, local_commands)
+            return result
+        logger.info("[Pipeline] Local builders declined -- falling back to LLM")
+
     named_ids = _face_ids_in_prompt(prompt)
     logger.info(f"[Pipeline] Face IDs in prompt: {named_ids or '(none - natural language)'}")
 
@@ -434,6 +748,15 @@ def execute_edit_from_prompt(step_path: str, prompt: str, pre_analyzed_features:
             "summary":      features.get("summary", ""),
             "_note":        f"Showing only the {len(named_ids)} face(s) named in the prompt out of {face_count} total.",
         }
+    elif detail_level == 'summary' or (
+            detail_level == 'auto'
+            and (len(all_cyls) > _SUMMARY_CYLS or len(all_planes) > _SUMMARY_PLANES)):
+        simplified_features = _summarize_features(features)
+        logger.info(
+            f"[Pipeline] Summary mode: {len(simplified_features['cylinder_groups'])} "
+            f"cylinder group(s) / {len(simplified_features['plane_groups'])} plane "
+            f"group(s) instead of {len(all_cyls) + len(all_planes)} face entries"
+        )
     else:
         truncated = len(all_cyls) > _MAX_LLM_CYLINDERS or len(all_planes) > _MAX_LLM_PLANES
         simplified_features = {
@@ -454,10 +777,51 @@ def execute_edit_from_prompt(step_path: str, prompt: str, pre_analyzed_features:
             f"{len(simplified_features['planes'])} planes to LLM"
         )
 
+    history = _load_edit_history(step_path)
+    if history:
+        # Prior (prompt, actions) pairs show the model the evolving
+        # design state -- fewer hallucinated faces on follow-up edits.
+        simplified_features["previous_edits"] = history
+
     commands = _get_action_from_llm(prompt, simplified_features, provider=provider)
     logger.info(f"[Pipeline] LLM determined actions: {commands}")
 
-    return execute_action(step_path, commands, features)
+    result = execute_action(step_path, commands, features)
+    _record_edit(step_path, prompt, commands)
+    return result
+
+
+def _join_batch_prompts(prompts: List[str]) -> str:
+    """Combine several edit prompts into one numbered request block."""
+    sections = [
+        f"=== USER EDIT REQUEST {n} ===\n{p.strip()}"
+        for n, p in enumerate(prompts, 1)
+    ]
+    sections.append(
+        "Apply ALL of the numbered requests above, in order, and return "
+        "ONE JSON array containing every resulting action."
+    )
+    return "\n\n".join(sections)
+
+
+def execute_batch_from_prompts(step_path: str, prompts: List[str], pre_analyzed_features: dict = None,
+                               provider: str = 'gemini', detail_level: str = 'auto') -> Dict[str, Any]:
+    """Apply several edit prompts to one STEP with a single LLM call.
+
+    The prompts are joined into numbered sections so the action mapping
+    is amortized across all of them: one analysis, one Gemini round-trip,
+    one action array executed in order.
+    """
+    if not prompts:
+        raise ValueError("execute_batch_from_prompts requires at least one prompt.")
+    if len(prompts) == 1:
+        return execute_edit_from_prompt(step_path, prompts[0], pre_analyzed_features,
+                                        provider=provider, detail_level=detail_level)
+
+    combined = _join_batch_prompts(prompts)
+    logger.info(f"[Pipeline] Batched {len(prompts)} edit prompt(s) into one LLM request")
+    return execute_edit_from_prompt(step_path, combined, pre_analyzed_features,
+                                    provider=provider, detail_level=detail_level)
 
 
 def execute_action(step_path: str, commands: List[dict], original_features: dict) -> Dict[str, Any]:
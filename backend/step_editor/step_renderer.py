@@ -8,13 +8,36 @@ Three modes:
 """
 import os
 import math
+import tempfile
+import numpy as np
 import cadquery as cq
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+from step_editor import step_analyzer
+from core import config
+
+try:
+    from numba import njit, prange
+    NUMBA_ENABLED = True
+except ImportError:
+    NUMBA_ENABLED = False
+
+try:
+    from skimage.draw import line as _sk_line
+    SKIMAGE_ENABLED = True
+except ImportError:
+    SKIMAGE_ENABLED = False
+
 logger = logging.getLogger(__name__)
 
+# Sampled edge polylines per STEP file, keyed by content digest (same
+# digest the analyzer cache uses).  Skips the OCCT import + sampling on
+# re-renders of an unchanged file.
+_SAMPLE_CACHE_DIR = config.DATA_DIR / "render_cache"
+
 
 # ─── View definitions ─────────────────────────────────────────────────────────
 
@@ -105,56 +128,190 @@ def _ortho_project(x: float, y: float, z: float, u_axis, v_axis) -> Tuple[float,
     return su, sv
 
 
-def _map_to_canvas(sx, sy, proj_min, proj_max, canvas_w, canvas_h, margin=80):
-    """Map projected 2D coordinates to pixel canvas coordinates."""
-    px_min, py_min = proj_min
-    px_max, py_max = proj_max
-    span_x = max(px_max - px_min, 1e-6)
-    span_y = max(py_max - py_min, 1e-6)
-    cw = canvas_w - 2 * margin
-    ch = canvas_h - 2 * margin
-    cx = margin + (sx - px_min) / span_x * cw
-    cy = margin + (sy - py_min) / span_y * ch
-    return int(cx), int(cy)
-
-
-def _get_proj_bounds(projected_pts: List[Tuple[float, float]], extra_margin=0.12):
-    """Compute projected bounding box."""
-    if not projected_pts:
-        return (-10, -10), (10, 10)
-    xs = [p[0] for p in projected_pts]
-    ys = [p[1] for p in projected_pts]
-    pad_x = (max(xs) - min(xs)) * extra_margin
-    pad_y = (max(ys) - min(ys)) * extra_margin
-    return (min(xs) - pad_x, min(ys) - pad_y), (max(xs) + pad_x, max(ys) + pad_y)
+def _projection_matrix(view_cfg: dict) -> "np.ndarray":
+    """(3, 2) matrix mapping 3D points to projected (u, v) via pts @ P."""
+    if view_cfg.get("project_fn", "isometric") == "isometric":
+        c = math.cos(math.pi / 6)
+        s = math.sin(math.pi / 6)
+        # Columns reproduce _iso_project: sx = (x - y) c, sy = -((x + y) s + z)
+        return np.array([[c, -s], [-c, -s], [0.0, -1.0]])
+    u = np.asarray(view_cfg["u_axis"], dtype=np.float64)
+    v = np.asarray(view_cfg["v_axis"], dtype=np.float64)
+    return np.stack([u, v], axis=1)
+
+
+# View geometry never changes, so freeze the axes as read-only float64
+# arrays and build the projection matrices once at import time instead of
+# reconstructing tuples / rebranching on every render.
+for _view_cfg in VIEWS:
+    for _key in ("view_dir", "u_axis", "v_axis"):
+        if _key in _view_cfg:
+            _arr = np.asarray(_view_cfg[_key], dtype=np.float64)
+            _arr.setflags(write=False)
+            _view_cfg[_key] = _arr
+    _view_cfg["proj_matrix"] = _projection_matrix(_view_cfg)
+del _view_cfg, _key, _arr
+
+
+def _get_proj_bounds(projected_pts, extra_margin=0.12):
+    """Padded projection bounds of an (N, 2) array as two (2,) arrays.
+
+    One min/max reduction over the already-projected points -- no
+    separate Python pass over the geometry just to find the extents.
+    """
+    if len(projected_pts) == 0:
+        return np.array([-10.0, -10.0]), np.array([10.0, 10.0])
+    lo = projected_pts.min(axis=0)
+    hi = projected_pts.max(axis=0)
+    pad = (hi - lo) * extra_margin
+    return lo - pad, hi + pad
 
 
-def _sample_edge(edge, n_line=2, n_curve=24) -> List[Tuple[float, float, float]]:
+def _sample_edge(edge, n_line=2, n_curve=24, deflection=None) -> "np.ndarray":
     """
-    Sample 3D points along a CadQuery edge.
+    Sample 3D points along a CadQuery edge as an (n, 3) float64 array.
     Uses BRepAdaptor_Curve for accurate curve sampling.
+
+    When *deflection* is given, curves are sampled adaptively with
+    GCPnts_QuasiUniformDeflection: points are added only where the chord
+    would deviate from the curve by more than that tolerance, so gentle
+    arcs get a handful of points and tight splines get many.
     """
     from OCP.BRepAdaptor import BRepAdaptor_Curve
     from OCP.GeomAbs import GeomAbs_Line
+    from OCP.GCPnts import GCPnts_QuasiUniformDeflection
 
     try:
         adaptor = BRepAdaptor_Curve(edge.wrapped)
         curve_type = adaptor.GetType()
+        if curve_type != GeomAbs_Line and deflection:
+            try:
+                disc = GCPnts_QuasiUniformDeflection(adaptor, deflection)
+                if disc.IsDone() and disc.NbPoints() >= 2:
+                    pts = np.empty((disc.NbPoints(), 3), dtype=np.float64)
+                    for j in range(disc.NbPoints()):
+                        p = disc.Value(j + 1)
+                        pts[j, 0] = p.X()
+                        pts[j, 1] = p.Y()
+                        pts[j, 2] = p.Z()
+                    return pts
+            except Exception:
+                pass  # fall back to fixed-count sampling below
         n = n_line if curve_type == GeomAbs_Line else n_curve
         t0 = adaptor.FirstParameter()
         t1 = adaptor.LastParameter()
-        pts = []
+        pts = np.empty((n + 1, 3), dtype=np.float64)
         for j in range(n + 1):
             t = t0 + (t1 - t0) * j / n
             p = adaptor.Value(t)
-            pts.append((p.X(), p.Y(), p.Z()))
+            pts[j, 0] = p.X()
+            pts[j, 1] = p.Y()
+            pts[j, 2] = p.Z()
         return pts
     except Exception:
-        return []
+        return np.empty((0, 3), dtype=np.float64)
+
+
+def _sampled_edges_cached(step_path: Path) -> List["np.ndarray"]:
+    """
+    Import a STEP file and sample all its edges, with an .npz disk cache.
+
+    The cache key is the file's content digest (shared with the analyzer
+    cache), so a re-render of an unchanged file loads two flat arrays
+    instead of re-running the OCCT import and curve sampling.
+    """
+    cache_file = None
+    try:
+        st = os.stat(step_path)
+        digest = step_analyzer._file_digest(str(step_path), st.st_mtime_ns, st.st_size)
+        cache_file = _SAMPLE_CACHE_DIR / f"{digest}.npz"
+    except Exception as e:
+        logger.warning("Edge-sample cache unavailable: %s", e)
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            with np.load(cache_file) as blob:
+                pts = blob["pts"]
+                counts = blob["counts"]
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            return [pts[offsets[i]:offsets[i + 1]] for i in range(len(counts))]
+        except Exception as e:
+            logger.warning("Edge-sample cache read failed: %s", e)
+
+    model = cq.importers.importStep(str(step_path))
+
+    # Chord tolerance ~0.1% of the model diagonal: invisible at render
+    # resolution, but cuts sample counts several-fold on typical parts.
+    deflection = None
+    try:
+        bb = model.val().BoundingBox()
+        diag = math.sqrt(bb.xlen ** 2 + bb.ylen ** 2 + bb.zlen ** 2)
+        deflection = diag * 0.001 or None
+    except Exception as e:
+        logger.warning("Could not compute model bbox for adaptive sampling: %s", e)
+
+    all_edge_pts = [_sample_edge(e, deflection=deflection) for e in model.edges().vals()]
+    all_edge_pts = [pts for pts in all_edge_pts if len(pts) >= 2]
+
+    if cache_file is not None:
+        try:
+            _SAMPLE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            flat = (np.concatenate(all_edge_pts) if all_edge_pts
+                    else np.empty((0, 3), dtype=np.float64))
+            counts = np.array([len(p) for p in all_edge_pts], dtype=np.int64)
+            fd, tmp_path = tempfile.mkstemp(dir=_SAMPLE_CACHE_DIR, suffix=".npz")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, pts=flat, counts=counts)
+            os.replace(tmp_path, cache_file)
+        except Exception as e:
+            logger.warning("Edge-sample cache write failed: %s", e)
+
+    return all_edge_pts
 
 
 # ─── Visibility (depth-based culling) ─────────────────────────────────────────
 
+if NUMBA_ENABLED:
+    @njit(cache=True, parallel=True)
+    def _edge_depth_stats_numba(all_pts, offsets, view_dir):  # pragma: no cover
+        """Fused per-edge max depth + global min/max in one prange pass."""
+        n_edges = offsets.shape[0] - 1
+        edge_max = np.empty(n_edges, dtype=np.float64)
+        for e in prange(n_edges):
+            m = -1e300
+            for i in range(offsets[e], offsets[e + 1]):
+                d = (all_pts[i, 0] * view_dir[0]
+                     + all_pts[i, 1] * view_dir[1]
+                     + all_pts[i, 2] * view_dir[2])
+                if d > m:
+                    m = d
+            edge_max[e] = m
+        d_min = 1e300
+        d_max = -1e300
+        for i in range(all_pts.shape[0]):
+            d = (all_pts[i, 0] * view_dir[0]
+                 + all_pts[i, 1] * view_dir[1]
+                 + all_pts[i, 2] * view_dir[2])
+            d_min = min(d_min, d)
+            d_max = max(d_max, d)
+        return d_min, d_max, edge_max
+
+
+def _edge_depth_stats(all_pts, offsets, view_dir):
+    """(depth_min, depth_max, per-edge max depth) along view_dir.
+
+    Uses the JIT-compiled kernel when Numba is installed (compiled once,
+    cached on disk, parallel over edges); otherwise the NumPy
+    einsum + reduceat path.
+    """
+    vd = np.asarray(view_dir, dtype=np.float64)
+    if NUMBA_ENABLED:
+        return _edge_depth_stats_numba(all_pts, offsets, vd)
+    depths = np.einsum('ij,j->i', all_pts, vd)
+    return (float(depths.min()), float(depths.max()),
+            np.maximum.reduceat(depths, offsets[:-1]))
+
+
 def _is_edge_visible(pts: List[Tuple[float, float, float]], view_dir: tuple,
                      model_depth_min: float, threshold_frac=0.12) -> bool:
     """
@@ -170,28 +327,36 @@ def _is_edge_visible(pts: List[Tuple[float, float, float]], view_dir: tuple,
         model_depth_min: Minimum depth of any model point in this view direction.
         threshold_frac:  A fraction of model depth extent used as tolerance.
     """
-    if not pts:
+    if not len(pts):
         return False
-    depths = [_dot(p, view_dir) for p in pts]
-    return max(depths) > model_depth_min + threshold_frac
+    depths = np.einsum('ij,j->i', np.asarray(pts, dtype=np.float64),
+                       np.asarray(view_dir, dtype=np.float64))
+    return float(depths.max()) > model_depth_min + threshold_frac
     # If all points are near the back, hide the edge
 
 
 def _compute_model_depth_range(all_edge_pts, view_dir):
     """Compute min/max depth of all model points along view_dir."""
-    depths = []
-    for pts in all_edge_pts:
-        for p in pts:
-            depths.append(_dot(p, view_dir))
-    if not depths:
+    if not all_edge_pts:
+        return 0.0, 1.0
+    depths = np.einsum('ij,j->i', np.concatenate(all_edge_pts),
+                       np.asarray(view_dir, dtype=np.float64))
+    if not len(depths):
         return 0.0, 1.0
-    return min(depths), max(depths)
+    return float(depths.min()), float(depths.max())
 
 
 # ─── Plain render ─────────────────────────────────────────────────────────────
 
-def render(step_path: str, output_path: Optional[str] = None) -> str:
-    """Render a STEP file to an SVG/PNG image (isometric view)."""
+def render(step_path: str, output_path: Optional[str] = None,
+           use_svg: bool = False) -> str:
+    """Render a STEP file to a PNG image (isometric view).
+
+    Draws the wireframe directly with the same raster path that
+    render_multiview uses, skipping the old CadQuery SVG export +
+    cairosvg re-parse round-trip.  Pass use_svg=True for the legacy SVG
+    export (falls back to returning the .svg if PNG conversion fails).
+    """
     step_path = Path(step_path).resolve()
     if not step_path.exists():
         raise FileNotFoundError(f"STEP file not found: {step_path}")
@@ -201,30 +366,62 @@ def render(step_path: str, output_path: Optional[str] = None) -> str:
     else:
         output_path = Path(output_path).resolve()
 
-    model = cq.importers.importStep(str(step_path))
-    svg_path = output_path.with_suffix(".svg")
-    cq.exporters.export(model, str(svg_path), opt={
-        "width": 800, "height": 600,
-        "marginLeft": 10, "marginTop": 10,
-        "showAxes": False,
-        "projectionDir": (0.5, -0.5, 0.5),
-        "strokeColor": (0, 0, 0),
-        "hiddenColor": (0, 100, 0),
-        "showHidden": False,
-    })
+    if use_svg:
+        model = cq.importers.importStep(str(step_path))
+        svg_path = output_path.with_suffix(".svg")
+        cq.exporters.export(model, str(svg_path), opt={
+            "width": 800, "height": 600,
+            "marginLeft": 10, "marginTop": 10,
+            "showAxes": False,
+            "projectionDir": (0.5, -0.5, 0.5),
+            "strokeColor": (0, 0, 0),
+            "hiddenColor": (0, 100, 0),
+            "showHidden": False,
+        })
 
-    try:
-        import cairosvg
-        cairosvg.svg2png(url=str(svg_path), write_to=str(output_path), scale=2.0)
-        os.remove(svg_path)
-        return str(output_path)
-    except Exception as e:
-        logger.warning(f"PNG conversion unavailable ({e}). Returning SVG path.")
-        return str(svg_path)
+        try:
+            import cairosvg
+            cairosvg.svg2png(url=str(svg_path), write_to=str(output_path), scale=2.0)
+            os.remove(svg_path)
+            return str(output_path)
+        except Exception as e:
+            logger.warning(f"PNG conversion unavailable ({e}). Returning SVG path.")
+            return str(svg_path)
+
+    all_edge_pts = _sampled_edges_cached(step_path)
+    if all_edge_pts:
+        pts = np.concatenate(all_edge_pts)
+        ext = pts.max(axis=0) - pts.min(axis=0)
+        bbox = {"x_mm": round(float(ext[0]), 2),
+                "y_mm": round(float(ext[1]), 2),
+                "z_mm": round(float(ext[2]), 2)}
+    else:
+        bbox = {"x_mm": 0, "y_mm": 0, "z_mm": 0}
+
+    return _render_view(
+        view_cfg=VIEWS[0],  # isometric
+        all_edge_pts=all_edge_pts,
+        features={"bounding_box": bbox},
+        step_stem=step_path.stem,
+        output_path=output_path,
+    )
 
 
 # ─── Single labeled render (backward compat) ────────────────────────────────
 
+def _filter_drawable_planes(features: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop sub-mm² noise planes once up front.
+
+    The marker and legend loops used to re-test area_mm2 on every plane
+    in every view; filtering here runs the test once per render call.
+    """
+    planes = features.get("planes", [])
+    kept = [p for p in planes if p.get("area_mm2", 0) >= 0.5]
+    if len(kept) == len(planes):
+        return features
+    return {**features, "planes": kept}
+
+
 def render_labeled(step_path: str, features: Dict[str, Any], output_path: Optional[str] = None) -> str:
     """
     Render the ACTUAL part wireframe (all edges from the STEP model)
@@ -236,9 +433,8 @@ def render_labeled(step_path: str, features: Dict[str, Any], output_path: Option
     else:
         output_path = Path(output_path).resolve()
 
-    model = cq.importers.importStep(str(step_path))
-    all_edge_pts = [_sample_edge(e) for e in model.edges().vals()]
-    all_edge_pts = [pts for pts in all_edge_pts if len(pts) >= 2]
+    features = _filter_drawable_planes(features)
+    all_edge_pts = _sampled_edges_cached(step_path)
 
     img_path = _render_view(
         view_cfg=VIEWS[0],  # isometric
@@ -255,7 +451,8 @@ def render_labeled(step_path: str, features: Dict[str, Any], output_path: Option
 # ─── Multi-view render (7 angles) ────────────────────────────────────────────
 
 def render_multiview(step_path: str, features: Dict[str, Any],
-                     output_dir: Optional[str] = None) -> Dict[str, str]:
+                     output_dir: Optional[str] = None,
+                     force: bool = False) -> Dict[str, str]:
     """
     Render 7 labeled PNG images of the STEP model, one per view angle.
 
@@ -267,6 +464,7 @@ def render_multiview(step_path: str, features: Dict[str, Any],
         features:   Output dict from step_analyzer.analyze().
         output_dir: Directory in which to create the images folder.
                     Defaults to the same directory as step_path.
+        force:      Re-render even if the PNGs are newer than the STEP file.
 
     Returns:
         Dict mapping view name → absolute path to the PNG, e.g.:
@@ -283,26 +481,82 @@ def render_multiview(step_path: str, features: Dict[str, Any],
         folder = Path(output_dir) / step_path.stem
     folder.mkdir(parents=True, exist_ok=True)
 
-    # Load model once
-    model = cq.importers.importStep(str(step_path))
-    all_edge_pts = [_sample_edge(e) for e in model.edges().vals()]
-    all_edge_pts = [pts for pts in all_edge_pts if len(pts) >= 2]
-
+    features = _filter_drawable_planes(features)
+
+    # Early-exit when every PNG is newer than the STEP file -- the common
+    # path for the chat UI, which re-requests previews after each message.
+    if not force:
+        step_mtime = step_path.stat().st_mtime
+        fresh = {}
+        for view_cfg in VIEWS:
+            out_png = folder / f"{view_cfg['name']}.png"
+            if not (out_png.exists() and out_png.stat().st_mtime >= step_mtime):
+                break
+            fresh[view_cfg["name"]] = str(out_png)
+        else:
+            logger.info(f"All {len(VIEWS)} views up to date for {step_path.name}; skipping render")
+            return fresh
+
+    # Load model once (disk-cached: unchanged files skip the OCCT import)
+    all_edge_pts = _sampled_edges_cached(step_path)
+
+    # Depth stats for ALL views from per-edge bounding boxes (two-level
+    # culling): two reduceats give every edge's AABB, and the box depth
+    # bounds along each view_dir come from two tiny (n_edges, 3) matmuls
+    # instead of a full (total_samples, 7) depth matrix.  The six ortho
+    # view_dirs are axis-aligned, so for every view that actually culls
+    # the box bound equals the exact per-point max depth; for the
+    # isometric view the bound is merely conservative, and that view
+    # draws all edges anyway.
+    depth_stats_per_view = {}
+    if all_edge_pts:
+        all_pts = np.concatenate(all_edge_pts)
+        counts = np.array([len(p) for p in all_edge_pts], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        bmin = np.minimum.reduceat(all_pts, offsets[:-1], axis=0)  # (n_edges, 3)
+        bmax = np.maximum.reduceat(all_pts, offsets[:-1], axis=0)
+        view_dirs = np.array([v["view_dir"] for v in VIEWS], dtype=np.float64)
+        lo = np.minimum(bmin @ view_dirs.T, bmax @ view_dirs.T)    # (n_edges, 7)
+        hi = np.maximum(bmin @ view_dirs.T, bmax @ view_dirs.T)
+        d_min = lo.min(axis=0)
+        d_max = hi.max(axis=0)
+        for col, view_cfg in enumerate(VIEWS):
+            depth_stats_per_view[view_cfg["name"]] = (
+                float(d_min[col]), float(d_max[col]), hi[:, col])
+
+    # The 7 views are independent (distinct PNGs, read-only inputs), so
+    # render them across processes -- Pillow's many small draw calls
+    # hold the GIL, which rules out threads for this workload.
     result = {}
-    for view_cfg in VIEWS:
-        out_png = folder / f"{view_cfg['name']}.png"
-        try:
-            _render_view(
+    max_workers = min(len(VIEWS), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for view_cfg in VIEWS:
+            out_png = folder / f"{view_cfg['name']}.png"
+            if (not force and out_png.exists()
+                    and out_png.stat().st_mtime >= step_path.stat().st_mtime):
+                result[view_cfg["name"]] = str(out_png)
+                continue
+            fut = pool.submit(
+                _render_view,
                 view_cfg=view_cfg,
                 all_edge_pts=all_edge_pts,
                 features=features,
                 step_stem=step_path.stem,
                 output_path=out_png,
+                depth_stats=depth_stats_per_view.get(view_cfg["name"]),
+                scale=0.5,
             )
-            result[view_cfg["name"]] = str(out_png)
-            logger.info(f"Rendered view '{view_cfg['name']}' → {out_png}")
-        except Exception as exc:
-            logger.error(f"Failed to render view '{view_cfg['name']}': {exc}")
+            futures[fut] = (view_cfg["name"], out_png)
+
+        for fut in as_completed(futures):
+            view_name, out_png = futures[fut]
+            try:
+                fut.result()
+                result[view_name] = str(out_png)
+                logger.info(f"Rendered view '{view_name}' → {out_png}")
+            except Exception as exc:
+                logger.error(f"Failed to render view '{view_name}': {exc}")
 
     return result
 
@@ -315,25 +569,42 @@ _H        = 900    # total image height
 _LEGEND_W = 270    # right-side legend panel width
 _GEO_W    = _W - _LEGEND_W   # width available for geometry
 
-def _render_view(view_cfg: dict, all_edge_pts: List[List[Tuple]],
+# Font objects cached at module scope -- ImageFont.truetype re-opens and
+# re-parses the .ttf on every call, which adds up to 21 disk hits per
+# multiview render otherwise.
+_FONTS: Dict[Tuple[int, bool], Any] = {}
+
+def _get_font(size: int, bold: bool = False):
+    key = (size, bold)
+    if key not in _FONTS:
+        from PIL import ImageFont
+        try:
+            _FONTS[key] = ImageFont.truetype(
+                "arialbd.ttf" if bold else "arial.ttf", size)
+        except Exception:
+            _FONTS[key] = ImageFont.load_default()
+    return _FONTS[key]
+
+def _render_view(view_cfg: dict, all_edge_pts: List["np.ndarray"],
                  features: Dict[str, Any], step_stem: str,
-                 output_path, include_legend: bool = False) -> str:
-    """Render a single view and save it to output_path. Returns path string."""
-    from PIL import Image, ImageDraw, ImageFont
+                 output_path, include_legend: bool = False,
+                 depth_stats: Optional[tuple] = None,
+                 scale: float = 1.0) -> str:
+    """Render a single view and save it to output_path. Returns path string.
+
+    With scale < 1 the wireframe is rasterized at reduced resolution and
+    LANCZOS-upscaled; text, markers and legend still draw at full size,
+    so only the edge layer trades sharpness for speed.
+    """
+    from PIL import Image, ImageDraw
 
     img  = Image.new("RGB", (_W, _H), (248, 249, 250))
     draw = ImageDraw.Draw(img)
 
-    try:
-        font_label = ImageFont.truetype("arial.ttf", 13)
-        font_title = ImageFont.truetype("arial.ttf", 15)
-        font_sm    = ImageFont.truetype("arial.ttf", 11)
-        font_bold  = ImageFont.truetype("arialbd.ttf", 12)
-    except Exception:
-        font_label = ImageFont.load_default()
-        font_title = font_label
-        font_sm    = font_label
-        font_bold  = font_label
+    font_label = _get_font(13)
+    font_title = _get_font(15)
+    font_sm    = _get_font(11)
+    font_bold  = _get_font(12, bold=True)
 
     # ── Legend panel background ────────────────────────────────────────────────
     draw.rectangle([_GEO_W, 0, _W, _H], fill=(240, 242, 248))
@@ -341,51 +612,134 @@ def _render_view(view_cfg: dict, all_edge_pts: List[List[Tuple]],
 
     # ── Determine projection function ─────────────────────────────────────────
     proj_fn     = view_cfg.get("project_fn", "isometric")
-    u_axis      = view_cfg.get("u_axis")
-    v_axis      = view_cfg.get("v_axis")
-    view_direction = view_cfg.get("view_dir", (0.5, -0.5, 0.5))
-
-    def project3d(x, y, z):
-        if proj_fn == "isometric":
-            return _iso_project(x, y, z)
-        return _ortho_project(x, y, z, u_axis, v_axis)
-
-    # ── Visibility culling ─────────────────────────────────────────────────────
-    depth_min, depth_max = _compute_model_depth_range(all_edge_pts, view_direction)
+    view_direction = np.asarray(view_cfg.get("view_dir", (0.5, -0.5, 0.5)),
+                                dtype=np.float64)
+
+    # ── Visibility culling (vectorized) ───────────────────────────────────────
+    edge_counts = np.array([len(p) for p in all_edge_pts], dtype=np.int64)
+    if not len(all_edge_pts):
+        all_pts = np.empty((0, 3), dtype=np.float64)
+        depth_min, depth_max = 0.0, 1.0
+        edge_max = np.empty(0, dtype=np.float64)
+    else:
+        all_pts = np.concatenate(all_edge_pts)
+        if depth_stats is not None:
+            # Precomputed once for all views by render_multiview
+            depth_min, depth_max, edge_max = depth_stats
+        else:
+            offsets = np.concatenate(([0], np.cumsum(edge_counts)))
+            depth_min, depth_max, edge_max = _edge_depth_stats(
+                all_pts, offsets, view_direction)
     depth_range = max(depth_max - depth_min, 1e-6)
     visibility_threshold = depth_min + depth_range * 0.12
 
-    if proj_fn == "isometric":
-        visible_edge_pts = all_edge_pts
+    if proj_fn == "isometric" or not len(all_edge_pts):
+        vis_pts = all_pts
+        vis_counts = edge_counts
     else:
-        visible_edge_pts = [
-            pts for pts in all_edge_pts
-            if max(_dot(p, view_direction) for p in pts) > visibility_threshold
-        ]
+        mask = edge_max > visibility_threshold
+        # Expand the per-edge mask to per-point and slice once -- no
+        # Python loop over the kept edges.
+        vis_pts = all_pts[np.repeat(mask, edge_counts)]
+        vis_counts = edge_counts[mask]
 
     # ── Projection bounds (geometry area only) ────────────────────────────────
-    all_proj = [project3d(*p) for pts in visible_edge_pts for p in pts]
-    proj_min, proj_max = _get_proj_bounds(all_proj)
+    proj_matrix = view_cfg.get("proj_matrix")
+    if proj_matrix is None:
+        proj_matrix = _projection_matrix(view_cfg)
+    proj = vis_pts @ proj_matrix
+    proj_min, proj_max = _get_proj_bounds(proj)
 
     MARGIN = 80
-    def to_px(x, y, z):
-        sx, sy = project3d(x, y, z)
-        px_min, py_min = proj_min
-        px_max, py_max = proj_max
-        span_x = max(px_max - px_min, 1e-6)
-        span_y = max(py_max - py_min, 1e-6)
-        cw = _GEO_W - 2 * MARGIN
-        ch = _H     - 2 * MARGIN
-        cx = MARGIN + (sx - px_min) / span_x * cw
-        cy = MARGIN + (sy - py_min) / span_y * ch
-        return int(cx), int(cy)
+    # One affine (scale, offset) pair maps projected coords to pixels for
+    # edges, markers and axis indicators alike.
+    span = np.maximum(proj_max - proj_min, 1e-6)
+    px_scale = np.array([_GEO_W - 2 * MARGIN, _H - 2 * MARGIN]) / span
+    px_offset = MARGIN - proj_min * px_scale
+
+    # Scalar mapper for the few text/marker/axis points.  Projection and
+    # affine constants are unpacked to plain floats and bound as default
+    # args, so every lookup inside is a local -- no closure or ndarray
+    # indexing per call.
+    _m00, _m10, _m20 = (float(c) for c in proj_matrix[:, 0])
+    _m01, _m11, _m21 = (float(c) for c in proj_matrix[:, 1])
+
+    def to_px(x, y, z,
+              _m00=_m00, _m10=_m10, _m20=_m20,
+              _m01=_m01, _m11=_m11, _m21=_m21,
+              _sx=float(px_scale[0]), _sy=float(px_scale[1]),
+              _ox=float(px_offset[0]), _oy=float(px_offset[1])):
+        u = x * _m00 + y * _m10 + z * _m20
+        v = x * _m01 + y * _m11 + z * _m21
+        return int(u * _sx + _ox), int(v * _sy + _oy)
+
+    def to_px_batch(locs):
+        """Project and canvas-map an (N, 3) array of points in one shot."""
+        return (locs @ proj_matrix * px_scale + px_offset).astype(np.int32)
 
     # ── Draw edges ────────────────────────────────────────────────────────────
-    EDGE_COLOR = (80, 100, 130)
-    for pts in visible_edge_pts:
-        px_pts = [to_px(*p) for p in pts]
-        for k in range(len(px_pts) - 1):
-            draw.line([px_pts[k], px_pts[k + 1]], fill=EDGE_COLOR, width=1)
+    EDGE_COLOR      = (80, 100, 130)
+    EDGE_COLOR_BACK = (175, 188, 206)   # rear edges in the isometric cue
+    BG_COLOR        = (248, 249, 250)
+    if len(proj):
+        # Affine canvas mapping for every sampled point in one broadcast
+        px_all = proj * px_scale + px_offset
+        if scale < 1.0:
+            # Rasterize the wireframe into a smaller layer (4x fewer
+            # pixels at 0.5) and upscale it under the full-size text.
+            lw, lh = max(int(_GEO_W * scale), 1), max(int(_H * scale), 1)
+            px_int = (px_all * scale).astype(np.int32)
+        else:
+            lw, lh = _GEO_W, _H
+            px_int = px_all.astype(np.int32)
+
+        starts = np.concatenate(([0], np.cumsum(vis_counts)))[:-1]
+        edge_order = np.arange(len(vis_counts))
+        edge_colors = None
+        if proj_fn == "isometric" and len(vis_counts):
+            # Painter's cue: draw back-to-front, rear edges in a lighter
+            # shade, so foreground lines overdraw background clutter.
+            # Ortho views skip this -- culling already removed the back.
+            depths_vis = np.einsum('ij,j->i', vis_pts, view_direction)
+            edge_mean = (np.add.reduceat(depths_vis, starts) / vis_counts)
+            lo, hi = float(edge_mean.min()), float(edge_mean.max())
+            alpha = (edge_mean - lo) / max(hi - lo, 1e-6)
+            edge_order = np.argsort(edge_mean)
+            back = np.array(EDGE_COLOR_BACK, dtype=np.float64)
+            front = np.array(EDGE_COLOR, dtype=np.float64)
+            edge_colors = (back + (front - back) * alpha[:, None]).astype(np.uint8)
+
+        if SKIMAGE_ENABLED:
+            # Rasterize every segment into a raw uint8 grid and hand PIL
+            # one finished buffer: thousands of draw.line calls become
+            # fancy-index writes plus a single fromarray.
+            canvas = np.full((lh, lw, 3), BG_COLOR, dtype=np.uint8)
+            xs = np.clip(px_int[:, 0], 0, lw - 1)
+            ys = np.clip(px_int[:, 1], 0, lh - 1)
+            for e in edge_order:
+                color = (EDGE_COLOR if edge_colors is None
+                         else edge_colors[e])
+                s = starts[e]
+                for i in range(s, s + vis_counts[e] - 1):
+                    rr, cc = _sk_line(ys[i], xs[i], ys[i + 1], xs[i + 1])
+                    canvas[rr, cc] = color
+            layer = Image.fromarray(canvas)
+        else:
+            layer = Image.new("RGB", (lw, lh), BG_COLOR)
+            edge_draw = ImageDraw.Draw(layer)
+            for e in edge_order:
+                # One polyline call per edge -- Pillow joins consecutive
+                # points internally, so no per-segment Python loop.
+                s = starts[e]
+                seg = [tuple(p) for p in px_int[s:s + vis_counts[e]].tolist()]
+                if len(seg) >= 2:
+                    color = (EDGE_COLOR if edge_colors is None
+                             else tuple(int(c) for c in edge_colors[e]))
+                    edge_draw.line(seg, fill=color, width=1)
+
+        if scale < 1.0:
+            layer = layer.resize((_GEO_W, _H), Image.LANCZOS)
+        img.paste(layer, (0, 0))
 
     # ── Axis indicators (isometric only) ─────────────────────────────────────
     if proj_fn == "isometric":
@@ -404,7 +758,8 @@ def _render_view(view_cfg: dict, all_edge_pts: List[List[Tuple]],
 
     # ── Feature markers (geometry area) ───────────────────────────────────────
     _draw_feature_markers(draw, features, to_px, view_direction,
-                          visibility_threshold, font_bold, font_sm, view_cfg)
+                          visibility_threshold, font_bold, font_sm, view_cfg,
+                          to_px_batch=to_px_batch)
 
     # ── Legend panel ──────────────────────────────────────────────────────────
     _draw_legend(draw, font_sm, font_bold, font_label, features)
@@ -447,7 +802,7 @@ def _marker_radius(feature: dict, feature_type: str, base: int = 8) -> int:
 
 
 def _draw_feature_markers(draw, features, to_px, view_direction, visibility_threshold,
-                          font_badge, font_sm, view_cfg):
+                          font_badge, font_sm, view_cfg, to_px_batch=None):
     """
     Draw pattern markers for all visible features.
 
@@ -456,15 +811,34 @@ def _draw_feature_markers(draw, features, to_px, view_direction, visibility_thre
     - Draw a short ID badge (e.g. 'C2', 'P14') next to the shape ONLY if it
       doesn’t overlap any previously-placed badges.  This prevents the label
       blizzard on complex parts while preserving the marker itself.
+
+    Visibility and pixel positions are computed for all features in one
+    batch up front; the loops below only draw.
     """
     from PIL import ImageDraw as _ID
 
     proj_fn = view_cfg.get("project_fn", "isometric")
 
-    def visible(loc):
-        if proj_fn == "isometric":
-            return True
-        return _dot(tuple(loc), view_direction) >= visibility_threshold
+    # ── Batched visibility + projection ───────────────────────────────────────
+    marked = ([("cylinder", c) for c in features.get("cylinders", [])]
+              + [("plane", p) for p in features.get("planes", [])]
+              + [("cone", k) for k in features.get("cones", [])])
+    if not marked:
+        return
+    locs = np.asarray([f["location"] for _, f in marked], dtype=np.float64)
+    if proj_fn == "isometric":
+        vis_mask = np.ones(len(marked), dtype=bool)
+    else:
+        vis_mask = locs @ view_direction >= visibility_threshold
+    if to_px_batch is not None:
+        pix = to_px_batch(locs)
+    else:
+        pix = np.array([to_px(*loc) for loc in locs], dtype=np.int64)
+
+    by_kind = {"cylinder": [], "plane": [], "cone": []}
+    for i, (kind, feat) in enumerate(marked):
+        if vis_mask[i]:
+            by_kind[kind].append((feat, int(pix[i, 0]), int(pix[i, 1])))
 
     placed: List[Tuple] = []   # list of (x0,y0,x1,y1) bounding-boxes already drawn
 
@@ -484,10 +858,7 @@ def _draw_feature_markers(draw, features, to_px, view_direction, visibility_thre
 
     # ── Cylinders — filled red circles ────────────────────────────────────────
     CYL = (210, 40, 40)
-    for cyl in features.get("cylinders", []):
-        loc = cyl["location"]
-        if not visible(loc): continue
-        px, py = to_px(*loc)
+    for cyl, px, py in by_kind["cylinder"]:
         r = _marker_radius(cyl, "cylinder")
         draw.ellipse([px-r, py-r, px+r, py+r], fill=CYL, outline=(255,255,255), width=2)
         badge = cyl["id"].replace("f","C")  # e.g. "f3" -> "C3"
@@ -496,12 +867,7 @@ def _draw_feature_markers(draw, features, to_px, view_direction, visibility_thre
     # ── Planes — filled squares (horiz) or diamonds (vert) ────────────────────
     PLN_H = (25, 90, 200)    # horizontal faces — strong blue square
     PLN_V = (80, 140, 220)   # vertical/side faces — lighter blue diamond
-    for pln in features.get("planes", []):
-        if pln.get("area_mm2", 0) < 0.5:   # skip sub-mm² noise
-            continue
-        loc = pln["location"]
-        if not visible(loc): continue
-        px, py = to_px(*loc)
+    for pln, px, py in by_kind["plane"]:
         r = _marker_radius(pln, "plane")
         ft = pln.get("face_type", "vertical")
         color = PLN_H if ft == "horizontal" else PLN_V
@@ -518,10 +884,7 @@ def _draw_feature_markers(draw, features, to_px, view_direction, visibility_thre
 
     # ── Cones — filled purple triangles ──────────────────────────────────────
     CONE = (180, 80, 200)
-    for cone in features.get("cones", []):
-        loc = cone["location"]
-        if not visible(loc): continue
-        px, py = to_px(*loc)
+    for cone, px, py in by_kind["cone"]:
         r = _marker_radius(cone, "cone")
         draw.polygon([
             (px, py - r), (px + r, py + r), (px - r, py + r)
@@ -615,7 +978,7 @@ def _draw_legend(draw, font_sm, font_bold, font_label, features):
     y += 4
     # ── Horizontal flat faces ────────────────────────
     h_planes = sorted(
-        [p for p in features.get("planes", []) if p.get("face_type") == "horizontal" and p.get("area_mm2",0) >= 0.5],
+        [p for p in features.get("planes", []) if p.get("face_type") == "horizontal"],
         key=lambda p: -p.get("area_mm2", 0)
     )
     section_header("■ HORIZ FACES", len(h_planes), PLN_H)
@@ -631,7 +994,7 @@ def _draw_legend(draw, font_sm, font_bold, font_label, features):
     y += 4
     # ── Vertical / side flat faces ───────────────────
     v_planes = sorted(
-        [p for p in features.get("planes", []) if p.get("face_type") != "horizontal" and p.get("area_mm2",0) >= 0.5],
+        [p for p in features.get("planes", []) if p.get("face_type") != "horizontal"],
         key=lambda p: -p.get("area_mm2", 0)
     )
     section_header("◆ VERT FACES", len(v_planes), PLN_V)
@@ -1,22 +1,104 @@
+import hashlib
 import json
 import math
-from pathlib import Path
+import re
 from typing import Union, Dict, Any, Tuple, List, Optional
-from jsonschema import validate, ValidationError
+from jsonschema import Draft7Validator
+
+try:
+    import orjson
+    ORJSON_ENABLED = True
+except ImportError:
+    ORJSON_ENABLED = False
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_ENABLED = True
+except ImportError:
+    FASTJSONSCHEMA_ENABLED = False
+
+# The schema never changes at runtime, so build the validator once at
+# import -- re-reading the file and re-walking the schema tree on every
+# call dominated validation time. The parsed dict itself comes from
+# core.schema_loader, the single module that reads scl_schema.json.
+from core.schema_loader import SCL_SCHEMA as _SCHEMA
+
+Draft7Validator.check_schema(_SCHEMA)
+_VALIDATOR = Draft7Validator(_SCHEMA)
+
+# fastjsonschema code-generates a function specialized to this schema,
+# which is one to two orders of magnitude faster than the generic
+# tree-walk; jsonschema remains the fallback.
+_FAST_VALIDATE = fastjsonschema.compile(_SCHEMA) if FASTJSONSCHEMA_ENABLED else None
+
+# Valid part keys are exactly part_N; one compiled match replaces the
+# startswith/split/int triple per key.
+_PART_KEY = re.compile(r"^part_(\d+)$")
+
+# Bound on collected schema violations; past this the document is
+# hopeless and further iteration only burns CPU and memory.
+_MAX_SCHEMA_ERRORS = 50
+
+# Shared read-only default for .get() calls -- avoids allocating a fresh
+# empty dict for every missing key in the per-part loops.
+_EMPTY: Dict[str, Any] = {}
+
+# Verdict memo for validate_json: batches of SCL files share structure,
+# so identical documents (keyed by a hash of their canonical bytes) skip
+# the validator entirely. Oversized documents are not cached and the
+# table is dropped wholesale when full to bound memory.
+_VERDICT_CACHE: Dict[bytes, bool] = {}
+_VERDICT_CACHE_MAX = 4096
+_VERDICT_DOC_LIMIT = 16384  # bytes of canonical JSON
+
+
+def _canonical_digest(json_data: Dict[str, Any]) -> Optional[bytes]:
+    """Hash of the sorted-key serialization, or None if uncacheable."""
+    try:
+        if ORJSON_ENABLED:
+            blob = orjson.dumps(json_data, option=orjson.OPT_SORT_KEYS)
+        else:
+            blob = json.dumps(json_data, sort_keys=True).encode()
+    except (TypeError, ValueError):
+        return None
+    if len(blob) > _VERDICT_DOC_LIMIT:
+        return None
+    return hashlib.blake2b(blob, digest_size=16).digest()
 
 
 def validate_json(json_input: Union[str, Dict[str, Any]]) -> bool:
-    result = validate_json_detailed(json_input)
+    # Callers here only need the verdict, so invalid payloads can bail
+    # out after the schema pass instead of paying for the full report,
+    # and repeated documents resolve from the verdict memo.
+    if isinstance(json_input, dict):
+        key = _canonical_digest(json_input)
+        if key is not None:
+            cached = _VERDICT_CACHE.get(key)
+            if cached is not None:
+                return cached
+            valid = validate_json_detailed(json_input, fast_fail=True)["valid"]
+            if len(_VERDICT_CACHE) >= _VERDICT_CACHE_MAX:
+                _VERDICT_CACHE.clear()
+            _VERDICT_CACHE[key] = valid
+            return valid
+    result = validate_json_detailed(json_input, fast_fail=True)
     return result["valid"]
 
 
-def validate_json_detailed(json_input: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
-    """Validate JSON against SCL schema with detailed error reporting."""
-    schema_path = Path(__file__).parent.parent / "core" / "scl_schema.json"
-
-    with open(schema_path, "r") as f:
-        schema = json.load(f)
+def validate_json_detailed(json_input: Union[str, Dict[str, Any]],
+                           fast_fail: bool = False) -> Dict[str, Any]:
+    """Validate JSON against SCL schema with detailed error reporting.
 
+    With ``fast_fail=True`` the structural and geometry passes are
+    skipped as soon as the schema check reports a violation; the result
+    then carries only the schema errors.
+    """
     if isinstance(json_input, str):
         try:
             json_data = json.loads(json_input)
@@ -28,34 +110,57 @@ def validate_json_detailed(json_input: Union[str, Dict[str, Any]]) -> Dict[str,
     errors = []
     warnings = []
 
-    try:
-        validate(instance=json_data, schema=schema)
-    except ValidationError as e:
-        path = " -> ".join(str(p) for p in e.absolute_path) if e.absolute_path else "root"
-        errors.append(f"Schema violation at '{path}': {e.message}")
+    if _FAST_VALIDATE is not None:
+        try:
+            _FAST_VALIDATE(json_data)
+        except fastjsonschema.JsonSchemaException as e:
+            path = " -> ".join(str(p) for p in e.path[1:]) if len(e.path) > 1 else "root"
+            errors.append(f"Schema violation at '{path}': {e.message}")
+    else:
+        # iter_errors collects every schema violation in one pass instead
+        # of raising on the first one. Capped so a badly malformed large
+        # document cannot pile up thousands of error strings.
+        for i, e in enumerate(_VALIDATOR.iter_errors(json_data)):
+            if i >= _MAX_SCHEMA_ERRORS:
+                errors.append("... additional schema errors truncated")
+                break
+            path = " -> ".join(str(p) for p in e.absolute_path) if e.absolute_path else "root"
+            errors.append(f"Schema violation at '{path}': {e.message}")
+
+    if fast_fail and errors:
+        return {"valid": False, "errors": errors, "warnings": warnings}
 
     structural_errors, structural_warnings = _validate_structural_integrity(json_data)
     errors.extend(structural_errors)
     warnings.extend(structural_warnings)
 
-    geometry_errors, geometry_warnings = _validate_geometry(json_data)
-    errors.extend(geometry_errors)
-    warnings.extend(geometry_warnings)
+    parts = json_data.get("parts", {})
+
+    # The geometry pass only walks parts, so there is nothing for it to
+    # check when the payload has none.
+    if isinstance(parts, dict) and parts:
+        geometry_errors, geometry_warnings = _validate_geometry(json_data)
+        errors.extend(geometry_errors)
+        warnings.extend(geometry_warnings)
+    else:
+        parts = _EMPTY
+
+    # One pass over the parts for all three summary flags instead of a
+    # separate any() scan per flag.
+    has_patterns = has_holes = has_revolve = False
+    for p in parts.values():
+        has_patterns |= "pattern" in p
+        has_holes |= "hole_feature" in p
+        has_revolve |= "revolve_profile" in p
 
     return {
         "valid": len(errors) == 0,
         "errors": errors,
         "warnings": warnings,
-        "parts_count": len(json_data.get("parts", {})),
-        "has_patterns": any(
-            "pattern" in p for p in json_data.get("parts", {}).values()
-        ),
-        "has_holes": any(
-            "hole_feature" in p for p in json_data.get("parts", {}).values()
-        ),
-        "has_revolve": any(
-            "revolve_profile" in p for p in json_data.get("parts", {}).values()
-        ),
+        "parts_count": len(parts),
+        "has_patterns": has_patterns,
+        "has_holes": has_holes,
+        "has_revolve": has_revolve,
     }
 
 
@@ -77,28 +182,28 @@ def _validate_structural_integrity(json_data: Dict) -> Tuple[List[str], List[str
 
     expected_nums = []
     for key in parts:
-        if not key.startswith("part_"):
-            errors.append(f"Invalid part key '{key}' - must be 'part_N'")
-            continue
-        try:
-            num = int(key.split("_")[1])
-            expected_nums.append(num)
-        except (IndexError, ValueError):
+        m = _PART_KEY.match(key)
+        if m:
+            expected_nums.append(int(m.group(1)))
+        elif key.startswith("part_"):
             errors.append(f"Invalid part key '{key}' - must be 'part_N' with integer N")
+        else:
+            errors.append(f"Invalid part key '{key}' - must be 'part_N'")
 
     if expected_nums:
-        expected_nums.sort()
-        if expected_nums[0] != 1:
-            errors.append(f"Parts must start from part_1, found part_{expected_nums[0]}")
-
-        for i in range(len(expected_nums) - 1):
-            if expected_nums[i+1] - expected_nums[i] > 1:
-                errors.append(f"Gap in part numbering: part_{expected_nums[i]} to part_{expected_nums[i+1]}")
+        # Contiguity needs no sort: keys are unique, so the range is
+        # gap-free exactly when max - min + 1 equals the count.
+        lo, hi = min(expected_nums), max(expected_nums)
+        if lo != 1:
+            errors.append(f"Parts must start from part_1, found part_{lo}")
+        if hi - lo + 1 != len(expected_nums):
+            errors.append(
+                f"Gap in part numbering (have {len(expected_nums)} parts, range part_{lo}-part_{hi})")
 
     first_part = parts.get("part_1")
     if first_part:
-        ext = first_part.get("extrusion", {})
-        rev = first_part.get("revolve", {})
+        ext = first_part.get("extrusion", _EMPTY)
+        rev = first_part.get("revolve", _EMPTY)
         op = ext.get("operation") or rev.get("operation")
         if op and op != "NewBodyFeatureOperation":
             errors.append(f"part_1 must use 'NewBodyFeatureOperation', found '{op}'")
@@ -129,7 +234,7 @@ def _validate_structural_integrity(json_data: Dict) -> Tuple[List[str], List[str
             errors.append(f"{part_key}: Has revolve_profile but missing revolve parameters")
 
         if has_sketch:
-            ext = part_data.get("extrusion", {})
+            ext = part_data.get("extrusion", _EMPTY)
             d1 = ext.get("extrude_depth_towards_normal", 0)
             d2 = ext.get("extrude_depth_opposite_normal", 0)
             if d1 == 0 and d2 == 0:
@@ -165,13 +270,13 @@ def _validate_geometry(json_data: Dict) -> Tuple[List[str], List[str]]:
 
         if "hole_feature" in part_data:
             hole = part_data["hole_feature"]
-            if hole.get("diameter", 0) <= 0:
+            diameter = hole.get("diameter", 0)
+            if diameter <= 0:
                 errors.append(f"{part_key}: Hole diameter must be > 0")
             if hole.get("depth", 0) < 0:
                 errors.append(f"{part_key}: Hole depth must be >= 0")
             if hole.get("hole_type") == "Counterbore":
-                cb_d = hole.get("counterbore_diameter", 0)
-                if cb_d <= hole.get("diameter", 0):
+                if hole.get("counterbore_diameter", 0) <= diameter:
                     errors.append(f"{part_key}: Counterbore diameter must be > hole diameter")
 
         if "pattern" in part_data:
@@ -190,63 +295,100 @@ def _validate_loop(part_key, face_key, loop_key, loop_data) -> Tuple[List[str],
     warnings = []
     prefix = f"{part_key}/{face_key}/{loop_key}"
 
-    circle_keys = [k for k in loop_data if k.startswith("circle_")]
-    line_keys = [k for k in loop_data if k.startswith("line_")]
-    arc_keys = [k for k in loop_data if k.startswith("arc_")]
-
-    if circle_keys and not line_keys and not arc_keys:
-        for ck in circle_keys:
-            r = loop_data[ck].get("Radius", 0)
+    # One pass over loop_data buckets every entity by prefix and parses
+    # its numeric suffix, instead of three startswith sweeps plus a
+    # fourth pass re-splitting the line/arc keys.
+    circles = []
+    items = []
+    for k, v in loop_data.items():
+        tag, _, num = k.partition("_")
+        try:
+            n = int(num)
+        except ValueError:
+            continue
+        if tag == "circle":
+            circles.append((k, v))
+        elif tag == "line":
+            items.append((n, "line", v))
+        elif tag == "arc":
+            items.append((n, "arc", v))
+
+    if circles and not items:
+        for ck, circle in circles:
+            r = circle.get("Radius", 0)
             if r <= 0:
                 errors.append(f"{prefix}/{ck}: Circle radius must be > 0")
         return errors, warnings
 
-    items = []
-    for k in line_keys:
-        items.append((int(k.split("_")[1]), "line", loop_data[k]))
-    for k in arc_keys:
-        items.append((int(k.split("_")[1]), "arc", loop_data[k]))
     items.sort(key=lambda x: x[0])
 
     if not items:
         warnings.append(f"{prefix}: Empty loop")
         return errors, warnings
 
-    first_start = None
+    first_start = items[0][2].get("Start Point")
     last_end = None
-    for idx, (num, item_type, item_data) in enumerate(items):
-        start = item_data.get("Start Point")
-        end = item_data.get("End Point")
-
-        if idx == 0 and start:
-            first_start = start
-        if end:
-            last_end = end
+    for _, _, item_data in reversed(items):
+        last_end = item_data.get("End Point")
+        if last_end:
+            break
 
-        if item_type == "arc":
-            mid = item_data.get("Mid Point")
-            if start and mid and end:
-                if _points_collinear(start, mid, end):
-                    warnings.append(f"{prefix}: Arc has collinear points (Start/Mid/End), may fail")
+    # Collinearity for all arcs in one batched area computation rather
+    # than a Python call per arc.
+    arc_pts = [(d.get("Start Point"), d.get("Mid Point"), d.get("End Point"))
+               for _, item_type, d in items if item_type == "arc"]
+    arc_pts = [t for t in arc_pts if all(t)]
+    if arc_pts:
+        if NUMPY_ENABLED and len(arc_pts) > 1:
+            s = np.asarray([t[0] for t in arc_pts], dtype=np.float64)
+            m = np.asarray([t[1] for t in arc_pts], dtype=np.float64)
+            e = np.asarray([t[2] for t in arc_pts], dtype=np.float64)
+            areas = np.abs((m[:, 0] - s[:, 0]) * (e[:, 1] - s[:, 1])
+                           - (e[:, 0] - s[:, 0]) * (m[:, 1] - s[:, 1]))
+            n_collinear = int(np.count_nonzero(areas < 0.001))
+        else:
+            n_collinear = sum(1 for t in arc_pts if _points_collinear(*t))
+        warnings.extend(
+            [f"{prefix}: Arc has collinear points (Start/Mid/End), may fail"]
+            * n_collinear)
 
     if first_start and last_end:
-        dist = math.sqrt((first_start[0]-last_end[0])**2 + (first_start[1]-last_end[1])**2)
-        if dist > 0.01:
-            warnings.append(f"{prefix}: Loop not closed (gap={dist:.4f})")
+        dx = first_start[0] - last_end[0]
+        dy = first_start[1] - last_end[1]
+        # Compare squared distance against the squared tolerance; the
+        # sqrt is only paid when the warning is actually emitted.
+        if dx * dx + dy * dy > 0.0001:
+            warnings.append(f"{prefix}: Loop not closed (gap={math.hypot(dx, dy):.4f})")
 
     return errors, warnings
 
 
 def _points_collinear(p1, p2, p3, tolerance=0.001):
     """Check if three 2D points are collinear."""
-    area = abs((p2[0]-p1[0])*(p3[1]-p1[1]) - (p3[0]-p1[0])*(p2[1]-p1[1]))
+    x1, y1 = p1[0], p1[1]
+    area = abs((p2[0]-x1)*(p3[1]-y1) - (p3[0]-x1)*(p2[1]-y1))
     return area < tolerance
 
 
 def repair_json(json_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
     """Attempt to auto-repair common JSON issues. Returns (repaired_data, repairs_made)."""
     repairs = []
-    data = json.loads(json.dumps(json_data))
+    # Copy-on-write instead of a json.dumps/loads round-trip: only the
+    # branches this function actually mutates (the outer dict, each part
+    # dict and its extrusion/revolve dicts) are copied; untouched
+    # branches like sketches are shared with the input.
+    data = {**json_data}
+    if "parts" in data:
+        new_parts = {}
+        for key, part in data["parts"].items():
+            part = {**part} if isinstance(part, dict) else part
+            if isinstance(part, dict):
+                if isinstance(part.get("extrusion"), dict):
+                    part["extrusion"] = {**part["extrusion"]}
+                if isinstance(part.get("revolve"), dict):
+                    part["revolve"] = {**part["revolve"]}
+            new_parts[key] = part
+        data["parts"] = new_parts
 
     if not data.get("final_name"):
         data["final_name"] = "Generated_Model"
@@ -1,5 +1,22 @@
 import re
-from typing import Dict, Tuple, Optional
+import sys
+from functools import lru_cache
+from typing import Dict, Tuple, Optional, FrozenSet
+
+try:
+    import ahocorasick
+    AHOCORASICK_ENABLED = True
+except ImportError:
+    AHOCORASICK_ENABLED = False
+
+# Compiled once at import; the seven suspicious patterns are fused into
+# one alternation so the engine makes a single pass over the prompt.
+_ALPHA_RE = re.compile(r"[a-zA-Z]")
+_DIGIT_RE = re.compile(r"\d")
+_DIMENSION_RE = re.compile(r"\d+\.?\d*\s*(mm|cm|inch|in|meter|m\b|feet|ft)")
+_SUSPICIOUS_RE = re.compile(
+    r"<script|javascript:|eval\(|exec\(|__import__|system\(|popen\(")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
 
 
 class PromptValidator:
@@ -43,6 +60,84 @@ class PromptValidator:
             "fitting": ["elbow", "tee", "coupling", "fitting", "adapter", "connector"],
         }
 
+        self.complex_indicators = [
+            "pattern", "array", "holes", "bolt circle",
+            "assembly", "multiple", "with", "and",
+            "counterbore", "countersink", "fillet", "chamfer",
+            "thread", "gear teeth",
+        ]
+
+        self.template_keywords = {
+            "cylinder": ["cylinder", "rod", "shaft", "circular", "round", "pin"],
+            "box": ["box", "cube", "rectangular", "square", "block", "plate"],
+            "tube": ["tube", "pipe", "hollow cylinder", "hollow", "bushing", "sleeve"],
+            "l_bracket": ["bracket", "l-bracket", "angle", "corner", "mount"],
+            "flange": ["flange", "mounting plate", "adapter", "disk", "bolt circle"],
+            "shaft": ["shaft", "axle", "spindle", "rod"],
+            "hex_bolt": ["bolt", "hex bolt", "hex head", "fastener"],
+            "nut": ["nut", "hex nut", "wing nut", "t-nut"],
+            "washer": ["washer", "spacer", "shim"],
+            "gear": ["gear", "spur gear", "teeth", "cog"],
+            "bearing": ["bearing", "ball bearing", "bushing"],
+            "standoff": ["standoff", "spacer", "PCB", "circuit board"],
+        }
+
+        # One table over every keyword group: each entry maps a keyword
+        # to the frozen set of (category, key) tags it carries.
+        entries: Dict[str, set] = {}
+        for kw in self.cad_keywords:
+            entries.setdefault(kw, set()).add(("cad", kw))
+        for shape, kws in self.shape_keywords.items():
+            for kw in kws:
+                entries.setdefault(kw, set()).add(("shape", shape))
+        for ind in self.complex_indicators:
+            entries.setdefault(ind, set()).add(("complex", ind))
+        for template, kws in self.template_keywords.items():
+            for kw in kws:
+                entries.setdefault(kw.lower(), set()).add(("template", template))
+
+        # Aho-Corasick, when available, finds all hits in a single
+        # O(len(prompt)) pass. The fallback partitions keywords into
+        # plain tokens (matched by an O(1) set intersection against the
+        # tokenized prompt) and multi-word/hyphenated phrases (the only
+        # ones that still need a substring scan).
+        self._automaton = None
+        if AHOCORASICK_ENABLED:
+            automaton = ahocorasick.Automaton()
+            for word, tags in entries.items():
+                automaton.add_word(word, frozenset(tags))
+            automaton.make_automaton()
+            self._automaton = automaton
+        self._single_word: Dict[str, frozenset] = {
+            sys.intern(kw): frozenset(tags) for kw, tags in entries.items()
+            if " " not in kw and "-" not in kw
+        }
+        self._multi_word: Tuple[Tuple[str, frozenset], ...] = tuple(
+            (kw, frozenset(tags)) for kw, tags in entries.items()
+            if " " in kw or "-" in kw
+        )
+
+        # The scan is pure given the lowered prompt, and the UI tends to
+        # resubmit the same handful of prompts (template buttons, retry
+        # loops), so repeats become a dict lookup. Per instance, since
+        # the keyword tables live on the instance.
+        self._scan = lru_cache(maxsize=1024)(self._scan_uncached)
+
+    def _scan_uncached(self, prompt_lower: str) -> FrozenSet[tuple]:
+        """Return every (category, key) tag whose keyword occurs in the prompt."""
+        hits = set()
+        if self._automaton is not None:
+            for _, tags in self._automaton.iter(prompt_lower):
+                hits |= tags
+            return frozenset(hits)
+        single = self._single_word
+        for token in set(_TOKEN_RE.findall(prompt_lower)) & single.keys():
+            hits |= single[token]
+        for kw, tags in self._multi_word:
+            if kw in prompt_lower:
+                hits |= tags
+        return frozenset(hits)
+
     def validate(self, prompt: str) -> Tuple[bool, Optional[str], Optional[Dict]]:
 
         if not prompt or not isinstance(prompt, str):
@@ -56,66 +151,53 @@ class PromptValidator:
         if len(prompt_clean) > self.max_length:
             return False, f"Prompt too long. Maximum {self.max_length} characters allowed.", None
 
-        if not re.search(r"[a-zA-Z]", prompt_clean):
+        if not _ALPHA_RE.search(prompt_clean):
             return False, "Prompt must contain alphabetic characters.", None
 
         prompt_lower = prompt_clean.lower()
 
-        has_cad_keyword = any(keyword in prompt_lower for keyword in self.cad_keywords)
+        # Single scan; every later check derives from this hit set.
+        hits = self._scan(prompt_lower)
+        keywords_found = [kw for kw in self.cad_keywords if ("cad", kw) in hits]
 
-        if not has_cad_keyword:
+        if not keywords_found:
             return False, "Prompt does not describe a CAD model. Please use geometric terms like 'cylinder', 'box', 'bracket', or dimensions like 'mm', 'diameter', etc.", {
                 "suggestion": "Try templates",
                 "templates": ["cylinder", "box", "l_bracket", "flange"],
             }
 
-        has_dimension = bool(re.search(r"\d+\.?\d*\s*(mm|cm|inch|in|meter|m\b|feet|ft)", prompt_lower))
-        has_number = bool(re.search(r"\d", prompt_clean))
+        has_dimension = bool(_DIMENSION_RE.search(prompt_lower))
+        has_number = bool(_DIGIT_RE.search(prompt_clean))
 
         if not has_number:
             return False, "Please include dimensions in your prompt (e.g., '100mm', '5 inches', '2cm diameter').", {
                 "suggestion": "Add numerical dimensions"
             }
 
-        suspicious_patterns = [
-            r"<script", r"javascript:", r"eval\(", r"exec\(",
-            r"__import__", r"system\(", r"popen\(",
-        ]
-
-        for pattern in suspicious_patterns:
-            if re.search(pattern, prompt_lower):
-                return False, "Invalid input detected. Please describe your CAD model without code or scripts.", None
-
-        keywords_found = [kw for kw in self.cad_keywords if kw in prompt_lower]
-        detected_shape = self._detect_shape(prompt_lower)
+        if _SUSPICIOUS_RE.search(prompt_lower):
+            return False, "Invalid input detected. Please describe your CAD model without code or scripts.", None
 
         metadata = {
             "length": len(prompt_clean),
             "has_dimensions": has_dimension,
             "has_numbers": has_number,
             "cad_keywords_found": keywords_found,
-            "detected_shape": detected_shape,
-            "complexity_hint": self._estimate_complexity(prompt_lower),
+            "detected_shape": self._detect_shape(hits),
+            "complexity_hint": self._estimate_complexity(hits),
         }
 
         return True, None, metadata
 
-    def _detect_shape(self, prompt_lower: str) -> str:
-        """Detect the primary shape category from the prompt."""
-        for shape, keywords in self.shape_keywords.items():
-            if any(kw in prompt_lower for kw in keywords):
+    def _detect_shape(self, hits: set) -> str:
+        """Detect the primary shape category from the scan hits."""
+        for shape in self.shape_keywords:
+            if ("shape", shape) in hits:
                 return shape
         return "unknown"
 
-    def _estimate_complexity(self, prompt_lower: str) -> str:
-        """Estimate model complexity from prompt."""
-        complex_indicators = [
-            "pattern", "array", "holes", "bolt circle",
-            "assembly", "multiple", "with", "and",
-            "counterbore", "countersink", "fillet", "chamfer",
-            "thread", "gear teeth",
-        ]
-        matches = sum(1 for ind in complex_indicators if ind in prompt_lower)
+    def _estimate_complexity(self, hits: set) -> str:
+        """Estimate model complexity from the scan hits."""
+        matches = sum(1 for ind in self.complex_indicators if ("complex", ind) in hits)
 
         if matches >= 3:
             return "complex"
@@ -124,26 +206,6 @@ class PromptValidator:
         return "simple"
 
     def suggest_templates(self, prompt: str) -> list:
-        prompt_lower = prompt.lower()
-        suggestions = []
-
-        template_keywords = {
-            "cylinder": ["cylinder", "rod", "shaft", "circular", "round", "pin"],
-            "box": ["box", "cube", "rectangular", "square", "block", "plate"],
-            "tube": ["tube", "pipe", "hollow cylinder", "hollow", "bushing", "sleeve"],
-            "l_bracket": ["bracket", "l-bracket", "angle", "corner", "mount"],
-            "flange": ["flange", "mounting plate", "adapter", "disk", "bolt circle"],
-            "shaft": ["shaft", "axle", "spindle", "rod"],
-            "hex_bolt": ["bolt", "hex bolt", "hex head", "fastener"],
-            "nut": ["nut", "hex nut", "wing nut", "t-nut"],
-            "washer": ["washer", "spacer", "shim"],
-            "gear": ["gear", "spur gear", "teeth", "cog"],
-            "bearing": ["bearing", "ball bearing", "bushing"],
-            "standoff": ["standoff", "spacer", "PCB", "circuit board"],
-        }
-
-        for template, keywords in template_keywords.items():
-            if any(kw in prompt_lower for kw in keywords):
-                suggestions.append(template)
-
+        hits = self._scan(prompt.lower())
+        suggestions = [t for t in self.template_keywords if ("template", t) in hits]
         return suggestions[:5]